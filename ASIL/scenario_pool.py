@@ -0,0 +1,145 @@
+"""Columnar in-memory scenario pool shared by the NSGA and Random Search scripts.
+
+scenarios.json is loaded once into typed contiguous arrays so fitness and
+metric code can gather by index array instead of walking lists of dicts.
+"""
+import json
+import numpy as np
+from asil_classifier import PEDESTRIAN, WEATHERS, classify, asil_labels, encode_collision_types, encode_weathers
+
+# Weather probability by weather code (same order as WEATHERS); unknown weather (-1) maps to NaN
+WEATHER_PROBABILITIES = np.array([
+    {"ClearNoon": 0.4, "ClearNight": 0.6, "HardRainNoon": 0.8, "HardRainNight": 1.0}[w] for w in WEATHERS
+] + [np.nan])
+
+
+def calculate_collision_probability(speed, time_to_collision, weather):
+    time_probability = 1 - (time_to_collision / 10)
+    speed_probability = speed / 32
+    weather_probability = WEATHER_PROBABILITIES[weather]
+    return time_probability * speed_probability * weather_probability
+
+
+def _take(records, indices):
+    # Record sources may be lists of dicts or lazy sequences (e.g. a binary store) with their own take()
+    if hasattr(records, "take"):
+        return records.take(indices)
+    return [records[i] for i in indices]
+
+
+def _encode_strings(values):
+    # Dictionary-encode repeated strings into (codes, table)
+    table = {}
+    codes = np.fromiter((table.setdefault(v, len(table)) for v in values), dtype=np.int32)
+    return codes, list(table)
+
+
+class ScenarioPool:
+    """Scenario attributes as NumPy columns, one row per scenario."""
+
+    def __init__(self, speed, time_to_collision, intensity, weather, collision_category, names,
+                 description_codes, descriptions, records=None, annotations=None, probability=None):
+        self.speed = np.ascontiguousarray(speed, dtype=np.float64)
+        self.time_to_collision = np.ascontiguousarray(time_to_collision, dtype=np.float64)
+        self.intensity = np.ascontiguousarray(intensity, dtype=np.float64)
+        self.weather = np.ascontiguousarray(weather, dtype=np.int8)
+        self.collision_category = np.ascontiguousarray(collision_category, dtype=np.int8)
+        # Side tables: names per row, descriptions dictionary-encoded, original records and
+        # extra per-row output fields (e.g. "ASIL Level") for output. Fixed-width string arrays
+        # (shared_pool.py) are kept as they are
+        self.names = names if isinstance(names, np.ndarray) and names.dtype.kind == "U" else \
+            np.asarray(names, dtype=object)
+        self.description_codes = np.ascontiguousarray(description_codes, dtype=np.int32)
+        self.descriptions = list(descriptions)
+        self.records = records
+        self.annotations = dict(annotations or {})
+        self.probability = calculate_collision_probability(self.speed, self.time_to_collision, self.weather) \
+            if probability is None else np.ascontiguousarray(probability, dtype=np.float64)
+
+    @classmethod
+    def from_records(cls, records):
+        description_codes, descriptions = _encode_strings(s["Scenario Description"] for s in records)
+        return cls(
+            speed=np.array([s["Speed at Collision"] for s in records], dtype=np.float64),
+            time_to_collision=np.array([s["Time to Collision"] for s in records], dtype=np.float64),
+            intensity=np.array([s["Intensity"] for s in records], dtype=np.float64),
+            weather=encode_weathers(s["Weather"] for s in records),
+            collision_category=encode_collision_types(s["Collision Type"] for s in records),
+            names=[s["Scenario Name"] for s in records],
+            description_codes=description_codes,
+            descriptions=descriptions,
+            records=records,
+        )
+
+    @classmethod
+    def from_json(cls, file_path):
+        with open(file_path, 'r') as file:
+            return cls.from_records(json.load(file))
+
+    def __len__(self):
+        return len(self.speed)
+
+    def subset(self, indices):
+        """Return a new pool holding only the given rows (index array or boolean mask)."""
+        indices = np.flatnonzero(indices) if np.asarray(indices).dtype == bool else np.asarray(indices, dtype=np.intp)
+        return ScenarioPool(
+            speed=self.speed[indices],
+            time_to_collision=self.time_to_collision[indices],
+            intensity=self.intensity[indices],
+            weather=self.weather[indices],
+            collision_category=self.collision_category[indices],
+            names=self.names[indices],
+            description_codes=self.description_codes[indices],
+            descriptions=self.descriptions,
+            records=None if self.records is None else _take(self.records, indices),
+            annotations={field: values[indices] for field, values in self.annotations.items()},
+        )
+
+    def pedestrian_mask(self):
+        return self.collision_category == PEDESTRIAN
+
+    def vehicle_mask(self):
+        return self.collision_category != PEDESTRIAN
+
+    def collision_mask(self, user_choice):
+        # Pedestrian/cyclist collisions for "pedestrian", everything else otherwise
+        return self.pedestrian_mask() if user_choice == "pedestrian" else self.vehicle_mask()
+
+    def asil_codes(self):
+        return classify(self.speed, self.weather, self.collision_category)
+
+    def asil_levels(self):
+        return asil_labels(self.asil_codes())
+
+    def annotate(self, field, values):
+        """Attach a per-row field that to_records() adds to every output record."""
+        self.annotations[field] = np.asarray(values, dtype=object)
+
+    def to_records(self, indices=None):
+        if indices is None:
+            indices = range(len(self))
+        records = [self.records[i] for i in indices]
+        if self.annotations:
+            records = [dict(record, **{field: values[i] for field, values in self.annotations.items()})
+                       for i, record in zip(indices, records)]
+        return records
+
+    def calculate_diversity(self, indices):
+        # Use standard deviation as a measure of diversity, equal weighting per attribute
+        indices = np.asarray(indices, dtype=np.intp)
+        return (np.std(self.speed[indices]) + np.std(self.time_to_collision[indices])
+                + np.std(self.intensity[indices]))
+
+    def evaluate(self, indices):
+        """Return (mean collision probability, diversity, mean intensity) for a set of rows."""
+        indices = np.asarray(indices, dtype=np.intp)
+        return (np.mean(self.probability[indices]), self.calculate_diversity(indices),
+                np.mean(self.intensity[indices]))
+
+    def metrics(self, indices):
+        probability, diversity, intensity = self.evaluate(indices)
+        return {
+            "Average Collision Probability": probability,
+            "Diversity Index": diversity,
+            "Average Intensity": intensity
+        }
@@ -1,14 +1,8 @@
-import json
 from scipy import stats
+from util import read_metrics
 import numpy as np
 import matplotlib.pyplot as plt
 
-# Function to read metrics from a JSON file
-def read_metrics_from_json(file_path):
-    with open(file_path, 'r') as file:
-        data = json.load(file)
-    return data
-
 def perform_statistical_test_and_print_results(metric_name, data1, data2):
     # Perform the Mann-Whitney U test
     u_statistic, p_value = stats.mannwhitneyu(data1, data2, alternative='two-sided')
@@ -41,9 +35,14 @@ def plot_comparison(metric_name, data1, data2, labels):
     plt.grid(True, axis='y', linestyle='--', alpha=0.7)
     plt.show()
 
-# Load results from JSON files
-nsga2_results = read_metrics_from_json("nsga2_results.json")
-random_search_results = read_metrics_from_json("random_search_results.json")
+# Compare like-for-like runs only: the whole pool (no ASIL filter), one collision type
+configuration = {"ASIL Filter": None, "Collision Type": "vehicle"}
+
+# Load results from the JSON-lines logs (and older JSON array files, if present)
+nsga2_results = list(read_metrics("nsga2_results.json", "nsga2_results.jsonl", where=configuration))
+random_search_results = list(read_metrics("random_search_results.json", "random_search_results.jsonl",
+                                          where=configuration))
+print(f"Comparing {len(nsga2_results)} NSGA-II and {len(random_search_results)} Random Search runs with {configuration}\n")
 
 # Extract metrics
 nsga2_collision_probabilities = [result["Average Collision Probability"] for result in nsga2_results]
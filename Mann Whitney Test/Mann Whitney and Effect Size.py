@@ -1,12 +1,6 @@
-import json
 import numpy as np
 from scipy import stats
-
-# Function to read metrics from a JSON file
-def read_metrics_from_json(file_path):
-    with open(file_path, 'r') as file:
-        data = json.load(file)
-    return data
+from util import read_metrics
 
 def perform_statistical_test_and_calculate_effect_size(metric_name, data1, data2):
     # Perform the Mann-Whitney U test
@@ -44,9 +38,14 @@ def perform_statistical_test_and_calculate_effect_size(metric_name, data1, data2
     else:
         print(f"Random Search has performed better in terms of '{metric_name}'.\n")
 
-# Load results from JSON files
-nsga2_results = read_metrics_from_json("nsga2_results.json")
-random_search_results = read_metrics_from_json("random_search_results.json")
+# Compare like-for-like runs only: the whole pool (no ASIL filter), one collision type
+configuration = {"ASIL Filter": None, "Collision Type": "vehicle"}
+
+# Load results from the JSON-lines logs (and older JSON array files, if present)
+nsga2_results = list(read_metrics("nsga2_results.json", "nsga2_results.jsonl", where=configuration))
+random_search_results = list(read_metrics("random_search_results.json", "random_search_results.jsonl",
+                                          where=configuration))
+print(f"Comparing {len(nsga2_results)} NSGA-II and {len(random_search_results)} Random Search runs with {configuration}\n")
 
 # Extract metrics
 nsga2_collision_probabilities = [result["Average Collision Probability"] for result in nsga2_results]
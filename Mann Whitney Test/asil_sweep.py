@@ -0,0 +1,164 @@
+"""Run NSGA-II and Random Search for every ASIL level x collision type combination in one go.
+
+The pool is loaded, classified and partitioned once; its columns go to shared
+memory and the partitions, as row indices, to a process pool, and every
+combination is selected in parallel. NSGA-II runs
+once per ASIL level and its final population serves both collision types, as
+in NSGA_ASIL_choice.py where the collision type only filters the fronts.
+Selected scenarios are written per combination and the metrics appended to
+nsga2_results.jsonl / random_search_results.jsonl in the output directory,
+sweep/ by default so the sweep's rows stay out of the logs the Mann Whitney
+scripts compare.
+
+    python asil_sweep.py --scenarios ../NSGA/scenarios.json --output-dir sweep --seed 1
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from run_experiments import ALGORITHM_NAMES, ALGORITHMS, HERE, RESULT_FILES, _seed_globals
+from scenario_store import load_pool
+from shared_pool import SharedPool, attach_pool
+from nsga import SUBSET_SIZE, run_nsga, select_from_fronts
+from pareto import ParetoArchive
+from random_search import select_scenarios
+from util import append_metrics
+
+ASIL_LEVELS = ("A", "B", "C", "D", "QM")
+COLLISION_TYPES = ("vehicle", "pedestrian")
+SWEEP_DIR = os.path.join(HERE, "sweep")
+
+# Per-worker shared pool and partition row indices, set once by the pool initializer
+_pool = None
+_partitions = None
+
+
+def _attach_partitions(handle, partitions):
+    global _pool, _partitions
+    _pool = attach_pool(handle)
+    _partitions = partitions
+
+
+def asil_filter(level):
+    return f"ASIL {level}" if level in ['A', 'B', 'C', 'D'] else level
+
+
+def partition(pool, levels, collision_types, algorithms):
+    """Classify the pool once and split it into the rows each algorithm selects from:
+    NSGA-II by ASIL level, Random Search by collision type and ASIL level."""
+    asil_levels = np.asarray(pool.asil_levels())
+    pool.annotate("ASIL Level", asil_levels)
+    partitions = {}
+    for level in levels:
+        level_mask = asil_levels == asil_filter(level)
+        if "nsga2" in algorithms:
+            partitions["nsga2", level] = np.flatnonzero(level_mask)
+        if "random_search" in algorithms:
+            for collision_type in collision_types:
+                partitions["random_search", level, collision_type] = np.flatnonzero(
+                    level_mask & pool.collision_mask(collision_type))
+    return partitions
+
+
+def run_nsga2(level, collision_types, seed_sequence):
+    pool = _pool.subset(_partitions["nsga2", level])
+    if len(pool) < SUBSET_SIZE:
+        return {collision_type: (None, f"{len(pool)} scenarios, fewer than the subset size {SUBSET_SIZE}")
+                for collision_type in collision_types}
+    _seed_globals(seed_sequence)
+    archive = ParetoArchive()
+    population = run_nsga(pool, rng=np.random.default_rng(seed_sequence), verbose=False, archive=archive)
+    selections = {}
+    for collision_type in collision_types:
+        selected_indices = select_from_fronts(pool, population, pool.collision_mask(collision_type), archive=archive)
+        selections[collision_type] = (pool, selected_indices) if selected_indices else (None, "no scenarios selected")
+    return selections
+
+
+def run_random_search(level, collision_type, seed_sequence):
+    pool = _pool.subset(_partitions["random_search", level, collision_type])
+    if not len(pool):
+        return {collision_type: (None, "no scenarios")}
+    return {collision_type: (pool, select_scenarios(pool, rng=np.random.default_rng(seed_sequence)))}
+
+
+def run_job(algorithm, level, collision_types, seed_sequence):
+    """{collision type: (selected rows of the whole pool, metrics) or (None, reason skipped)} and the wall time."""
+    start_time = time.perf_counter()
+    if algorithm == "nsga2":
+        selections = run_nsga2(level, collision_types, seed_sequence)
+    else:
+        selections = run_random_search(level, collision_types[0], seed_sequence)
+    rows = _partitions[(algorithm, level) if algorithm == "nsga2" else (algorithm, level, collision_types[0])]
+    results = {}
+    for collision_type, (pool, selected) in selections.items():
+        results[collision_type] = (None, selected) if pool is None else \
+            (rows[selected].tolist(), pool.metrics(selected))
+    return results, time.perf_counter() - start_time
+
+
+def run_sweep(scenarios_path, levels=ASIL_LEVELS, collision_types=COLLISION_TYPES, algorithms=ALGORITHMS, seed=None,
+              workers=None, output_dir=SWEEP_DIR):
+    """Run every requested combination; returns {(algorithm, level, collision type): metrics or reason skipped}
+    and the root seed entropy."""
+    pool = load_pool(scenarios_path)
+    partitions = partition(pool, levels, collision_types, algorithms)
+
+    jobs = []
+    for algorithm in algorithms:
+        if algorithm == "nsga2":
+            jobs.extend((algorithm, level, tuple(collision_types)) for level in levels)
+        else:
+            jobs.extend((algorithm, level, (collision_type,)) for level in levels for collision_type in collision_types)
+    root = np.random.SeedSequence(seed)
+
+    summary = {}
+    os.makedirs(output_dir, exist_ok=True)
+    with SharedPool(pool) as shared, ProcessPoolExecutor(max_workers=workers, initializer=_attach_partitions,
+                                                         initargs=(shared.handle, partitions)) as executor:
+        futures = [executor.submit(run_job, *job, seed_sequence) for job, seed_sequence in zip(jobs, root.spawn(len(jobs)))]
+        for (algorithm, level, _), future in zip(jobs, futures):
+            results, wall_time = future.result()
+            for collision_type, (selected, metrics) in results.items():
+                summary[algorithm, level, collision_type] = metrics
+                if selected is None:
+                    continue
+                records = pool.to_records(selected)
+                output_file_path = os.path.join(output_dir, f"selected_scenarios_{algorithm}_{level}_{collision_type}.json")
+                with open(output_file_path, 'w') as outfile:
+                    json.dump(records, outfile, indent=4)
+                append_metrics(os.path.join(output_dir, RESULT_FILES[algorithm]), metrics, ALGORITHM_NAMES[algorithm],
+                               asil_filter=asil_filter(level), collision_type=collision_type, wall_time=wall_time)
+    return summary, root.entropy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", default=os.path.join(HERE, "..", "NSGA", "scenarios.json"))
+    parser.add_argument("--levels", nargs="+", choices=ASIL_LEVELS, default=list(ASIL_LEVELS))
+    parser.add_argument("--collision-types", nargs="+", choices=COLLISION_TYPES, default=list(COLLISION_TYPES))
+    parser.add_argument("--algorithms", nargs="+", choices=ALGORITHMS, default=list(ALGORITHMS))
+    parser.add_argument("--seed", type=int, default=None, help="root seed; a random one is drawn and printed if omitted")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--output-dir", default=SWEEP_DIR)
+    args = parser.parse_args()
+
+    summary, entropy = run_sweep(args.scenarios, args.levels, args.collision_types, args.algorithms, args.seed,
+                                 args.workers, args.output_dir)
+    print("Root seed:", entropy)
+
+    for (algorithm, level, collision_type), metrics in summary.items():
+        label = f"{ALGORITHM_NAMES[algorithm]}, {asil_filter(level)}, {collision_type}"
+        if isinstance(metrics, str):
+            print(f"{label}: skipped ({metrics})")
+        else:
+            print(f"{label}: " + ", ".join(f"{name} {value:.4g}" for name, value in metrics.items()))
+    print("Selected scenarios and metrics saved to:", args.output_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Run N seeds of NSGA-II and Random Search in a process pool and collect their metrics.
+
+scenarios.json (or a binary store) is loaded once and its columns put in shared memory, which
+every worker attaches to; each run gets its own RNG stream spawned from one SeedSequence. Each run's metrics and metadata are appended to
+nsga2_results.jsonl / random_search_results.jsonl, which the Mann Whitney
+scripts read.
+
+    python run_experiments.py --runs 30 --scenarios ../NSGA/scenarios.json
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.join(HERE, "..", "NSGA"), os.path.join(HERE, "..", "Random Search")]
+
+from scenario_store import load_pool  # noqa: E402
+from shared_pool import SharedPool, attach_pool  # noqa: E402
+from nsga import run_nsga, select_from_fronts  # noqa: E402
+from pareto import ParetoArchive  # noqa: E402
+from random_search import select_scenarios  # noqa: E402
+from util import append_metrics  # noqa: E402
+
+ALGORITHMS = ("nsga2", "random_search")
+RESULT_FILES = {"nsga2": "nsga2_results.jsonl", "random_search": "random_search_results.jsonl"}
+ALGORITHM_NAMES = {"nsga2": "NSGA-II", "random_search": "Random Search"}
+
+# Per-worker scenario pool, attached once by the pool initializer
+_pool = None
+
+
+def _attach_pool(handle):
+    global _pool
+    _pool = attach_pool(handle)
+
+
+def _seed_globals(seed_sequence):
+    # DEAP's variation and selection operators draw from the global `random` module
+    random.seed(int.from_bytes(seed_sequence.generate_state(4).tobytes(), "little"))
+
+
+def run_nsga2(pool, user_choice, seed_sequence):
+    _seed_globals(seed_sequence)
+    archive = ParetoArchive()
+    population = run_nsga(pool, rng=np.random.default_rng(seed_sequence), verbose=False, archive=archive)
+    return select_from_fronts(pool, population, pool.collision_mask(user_choice), archive=archive), pool
+
+
+def run_random_search(pool, user_choice, seed_sequence):
+    pool = pool.subset(pool.collision_mask(user_choice))
+    return select_scenarios(pool, rng=np.random.default_rng(seed_sequence)), pool
+
+
+RUNNERS = {"nsga2": run_nsga2, "random_search": run_random_search}
+
+
+def run_one(algorithm, user_choice, seed_sequence):
+    start_time = time.perf_counter()
+    selected_indices, pool = RUNNERS[algorithm](_pool, user_choice, seed_sequence)
+    return pool.metrics(selected_indices), time.perf_counter() - start_time
+
+
+def run_experiments(scenarios_path, runs, user_choice="vehicle", seed=None, algorithms=ALGORITHMS, workers=None,
+                    output_dir=HERE):
+    """Run `runs` independent seeds of each algorithm, appending every result to its metrics log.
+    Returns {algorithm: [metrics, ...]} and the root seed entropy."""
+    root = np.random.SeedSequence(seed)
+    streams = dict(zip(algorithms, root.spawn(len(algorithms))))
+    jobs = [(algorithm, seed_sequence) for algorithm in algorithms for seed_sequence in streams[algorithm].spawn(runs)]
+
+    results = {algorithm: [] for algorithm in algorithms}
+    os.makedirs(output_dir, exist_ok=True)
+    with SharedPool(load_pool(scenarios_path)) as shared, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_attach_pool, initargs=(shared.handle,)) as executor:
+        futures = [executor.submit(run_one, algorithm, user_choice, seed_sequence) for algorithm, seed_sequence in jobs]
+        for (algorithm, seed_sequence), future in zip(jobs, futures):
+            metrics, wall_time = future.result()
+            results[algorithm].append(metrics)
+            seed_record = {"entropy": seed_sequence.entropy, "spawn_key": list(seed_sequence.spawn_key)}
+            append_metrics(os.path.join(output_dir, RESULT_FILES[algorithm]), metrics, ALGORITHM_NAMES[algorithm],
+                           seed=seed_record, collision_type=user_choice, wall_time=wall_time)
+    return results, root.entropy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", default=os.path.join(HERE, "..", "NSGA", "scenarios.json"))
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--collision-type", choices=("vehicle", "pedestrian"), default="vehicle")
+    parser.add_argument("--algorithms", nargs="+", choices=ALGORITHMS, default=list(ALGORITHMS))
+    parser.add_argument("--seed", type=int, default=None, help="root seed; a random one is drawn and printed if omitted")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--output-dir", default=HERE)
+    args = parser.parse_args()
+
+    results, entropy = run_experiments(args.scenarios, args.runs, args.collision_type, args.seed,
+                                       args.algorithms, args.workers, args.output_dir)
+    print("Root seed:", entropy)
+
+    for algorithm, metrics in results.items():
+        print(f"{len(metrics)} {algorithm} runs appended to:", os.path.join(args.output_dir, RESULT_FILES[algorithm]))
+
+
+if __name__ == "__main__":
+    main()
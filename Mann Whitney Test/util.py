@@ -0,0 +1,70 @@
+import os
+import json
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+@contextmanager
+def locked(file):
+    # Advisory exclusive lock so concurrent runs never interleave or lose rows
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+    else:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            file.seek(0)
+            msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+def append_metrics(file_path, metrics, algorithm, seed=None, asil_filter=None, collision_type=None, wall_time=None):
+    # One JSON line per run: appending costs O(1) no matter how many runs the log holds
+    record = dict(metrics)
+    record.update({
+        "Algorithm": algorithm,
+        "Seed": seed,
+        "ASIL Filter": asil_filter,
+        "Collision Type": collision_type,
+        "Wall Time": wall_time
+    })
+    line = json.dumps(record) + "\n"
+    with open(file_path, 'a') as file:
+        with locked(file):
+            file.write(line)
+            file.flush()
+
+def _matches(record, where):
+    # Older rows record no metadata; a field they do not record does not exclude them
+    return all(record.get(field, value) == value for field, value in where.items())
+
+def read_metrics(*file_paths, where=None):
+    # Stream metric rows from JSON-lines logs; older JSON array files are read whole.
+    # Paths that do not exist are skipped, but at least one must exist.
+    # where={field: value} keeps only rows recorded with those metadata values, e.g. {"ASIL Filter": None}
+    where = where or {}
+    existing = [file_path for file_path in file_paths if os.path.exists(file_path)]
+    if not existing:
+        raise FileNotFoundError(f"No metrics file found among: {', '.join(file_paths)}")
+    for file_path in existing:
+        with open(file_path, 'r') as file:
+            first = file.read(1)
+            while first.isspace():
+                first = file.read(1)
+            file.seek(0)
+            if first == "[":
+                yield from (record for record in json.load(file) if _matches(record, where))
+                continue
+            for line in file:
+                if line.strip():
+                    record = json.loads(line)
+                    if _matches(record, where):
+                        yield record
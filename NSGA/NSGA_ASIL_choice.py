@@ -1,257 +1,73 @@
 import json
+import sys
+import os
 import numpy as np
-from deap import base, creator, tools, algorithms
-from util import save_metrics_to_json
+import time
+from util import append_metrics
+from scenario_store import load_pool
+from nsga import run_nsga, select_from_fronts
+from pareto import ParetoArchive
 
-def is_pedestrian_or_cyclist_collision(scenario):
-    collision_type = scenario["Collision Type"]
-    return "walker" in collision_type or "diamondback" in collision_type
+# Load scenarios once into typed columns
+all_pool = load_pool("./scenarios.json")
 
-def is_vehicle_collision(scenario):
-    return not is_pedestrian_or_cyclist_collision(scenario)
-
-def calculate_collision_probability(scenario):
-    time_probability = 1 - (scenario["Time to Collision"] / 10)
-    speed_probability = scenario["Speed at Collision"] / 32
-    weather_probabilities = {"ClearNoon": 0.4, "ClearNight": 0.6, "HardRainNoon": 0.8, "HardRainNight": 1.0}
-    weather_probability = weather_probabilities[scenario["Weather"]]
-    probability = time_probability * speed_probability * weather_probability
-    return probability
-
-def calculate_diversity(scenarios):
-    speed_values = np.array([s["Speed at Collision"] for s in scenarios])
-    time_values = np.array([s["Time to Collision"] for s in scenarios])
-    intensity_values = np.array([s["Intensity"] for s in scenarios])
-    
-    # Use standard deviation as a measure of diversity
-    speed_diversity = np.std(speed_values)
-    time_diversity = np.std(time_values)
-    intensity_diversity = np.std(intensity_values)
-    
-    # Aggregate the standard deviations into a single diversity measure
-    # Here, we assume equal weighting for each attribute's diversity
-    combined_diversity_score = speed_diversity + time_diversity + intensity_diversity
-    
-    return combined_diversity_score
-
-# Global Speed Ranges
-very_low_speed_range = (0, 15)
-low_speed_range = (15, 50)
-medium_speed_range = (50, 115)
-
-def convert_speed_mps_to_kph(speed_mps):
-    # Conversion factor: 1 km/h = 0.27778 m/s
-    return speed_mps * 3.6  # 1 m/s = 3.6 km/h
-
-def determine_severity(collision_type, speed_kph):
-    # Determine Severity
-    if collision_type == 'Pedestrian':
-        if very_low_speed_range[0] <= speed_kph < very_low_speed_range[1]:
-            return 'S2'
-        elif low_speed_range[0] <= speed_kph < low_speed_range[1] or medium_speed_range[0] <= speed_kph < medium_speed_range[1]:
-            return 'S3'
-    elif collision_type == 'NPC_VEHICLE':
-        if very_low_speed_range[0] <= speed_kph < very_low_speed_range[1]:
-            return 'S1'
-        elif low_speed_range[0] <= speed_kph < low_speed_range[1]:
-            return 'S2'
-        elif medium_speed_range[0] <= speed_kph < medium_speed_range[1]:
-            return 'S3'
-    elif collision_type == 'Obstacle':
-        return 'S0'
-    return 'Severity Not Defined'
-
-def determine_exposure(weather, speed_kph):
-    # Determine Exposure based on Weather and Speed
-    if (weather == 'HardRainNoon' or weather == 'HardRainNight') and medium_speed_range[0] <= speed_kph < medium_speed_range[1]:
-        return 'E4'
-    elif (weather == 'HardRainNoon' or weather == 'HardRainNight') and low_speed_range[0] <= speed_kph < low_speed_range[1]:
-        return 'E3'
-    elif (weather == 'HardRainNoon' or weather == 'HardRainNight') and very_low_speed_range[0] <= speed_kph < very_low_speed_range[1]:
-        return 'E2'
-    elif (weather == 'ClearNoon' or weather == 'ClearNight') and medium_speed_range[0] <= speed_kph < medium_speed_range[1]:
-        return 'E3'
-    elif (weather == 'ClearNoon' or weather == 'ClearNight') and low_speed_range[0] <= speed_kph < low_speed_range[1]:
-        return 'E2'
-    elif (weather == 'ClearNoon' or weather == 'ClearNight') and very_low_speed_range[0] <= speed_kph < very_low_speed_range[1]:
-        return 'E1'
-    else:
-        return 'Exposure Not Defined'
-
-def determine_asil(severity_class, exposure_class, controllability_class):
-    # ASIL Determination based on Severity, Exposure, and Controllability
-    if severity_class == 'S1' and exposure_class in ['E1', 'E2'] and controllability_class == 'C3':
-        return 'QM'
-    elif severity_class == 'S1' and exposure_class == 'E3' and controllability_class == 'C3':
-        return 'ASIL A'
-    elif severity_class == 'S1' and exposure_class == 'E4' and controllability_class == 'C3':
-        return 'ASIL B'
-    elif severity_class == 'S2' and exposure_class == 'E1' and controllability_class == 'C3':
-        return 'QM'
-    elif severity_class == 'S2' and exposure_class == 'E2' and controllability_class == 'C3':
-        return 'ASIL A'
-    elif severity_class == 'S2' and exposure_class == 'E3' and controllability_class == 'C3':
-        return 'ASIL B'
-    elif severity_class == 'S2' and exposure_class == 'E4' and controllability_class == 'C3':
-        return 'ASIL C'
-    elif severity_class == 'S3' and exposure_class == 'E1' and controllability_class == 'C3':
-        return 'ASIL A'
-    elif severity_class == 'S3' and exposure_class == 'E2' and controllability_class == 'C3':
-        return 'ASIL B'
-    elif severity_class == 'S3' and exposure_class == 'E3' and controllability_class == 'C3':
-        return 'ASIL C'
-    elif severity_class == 'S3' and exposure_class == 'E4' and controllability_class == 'C3':
-        return 'ASIL D'
-    else:
-        return 'ASIL Not Defined'
-
-# Define the problem object
-creator.create("FitnessMulti", base.Fitness, weights=(1.0, 1.0, 1.0)) # Maximize probability and intensity, minimize (maximize negative) diversity
-creator.create("Individual", list, fitness=creator.FitnessMulti)
-
-toolbox = base.Toolbox()
-
-# Assume scenarios is your list of scenarios loaded from JSON
-with open("./scenarios.json", 'r') as file:
-    all_scenarios = json.load(file)
-
-# Prepare a list to store the results
-asil_results = []
-
-for scenario in all_scenarios:
-    # Extract necessary information from each scenario
-    weather = scenario["Weather"]
-    collision_type = scenario["Collision Type"]
-    speed_mps = scenario["Speed at Collision"]
-
-    # Check collision_type to decide between pedestrian, vehicle, or obstacle
-    if "walker" in collision_type or "diamondback" in collision_type:
-        collision_type = 'Pedestrian'
-    elif "vehicle" in collision_type:
-        collision_type = 'NPC_VEHICLE'
-    else:
-        collision_type = 'Obstacle'
-
-    # Convert speed from m/s to kph
-    speed_kph = convert_speed_mps_to_kph(speed_mps)
-
-    # Determine Severity, Exposure, and ASIL classes
-    severity_class = determine_severity(collision_type, speed_kph)
-    exposure_class = determine_exposure(weather, speed_kph)
-    controllability_class = 'C3'  # Assuming a default value; modify as needed
-    asil_level = determine_asil(severity_class, exposure_class, controllability_class)
-
-    # Append the results with ASIL level to the list
-    scenario["ASIL Level"] = asil_level
-    asil_results.append(scenario)
+# Classify all scenarios in one vectorized pass
+asil_levels = all_pool.asil_levels()
+all_pool.annotate("ASIL Level", asil_levels)
 
 # Ask user for the ASIL level they are interested in
-user_choice = input("Enter the ASIL level to filter (A, B, C, D, or QM): ")
+user_choice = input("Enter the ASIL level to filter (A, B, C, D, or QM): ").strip().upper()
+if user_choice not in ['A', 'B', 'C', 'D', 'QM']:
+    sys.exit(f"Unknown ASIL level: {user_choice!r}")
 asil_choice = f"ASIL {user_choice}" if user_choice in ['A', 'B', 'C', 'D'] else user_choice
 
 # Filter scenarios based on the ASIL level
-filtered_scenarios = [scenario for scenario in asil_results if scenario["ASIL Level"] == asil_choice]
+pool = all_pool.subset(np.asarray(asil_levels) == asil_choice)
 
 # Save the filtered scenarios to a new JSON file
 with open("./filtered_scenarios.json", 'w') as file:
-    json.dump(filtered_scenarios, file, indent=4)
+    json.dump(pool.to_records(), file, indent=4)
 print(f"Filtered scenarios saved to: ./filtered_scenarios.json")
 
-with open("./filtered_scenarios.json", 'r') as file:
-    scenarios = json.load(file)
-
-# Individual generation
-toolbox.register("attr_bool", np.random.choice, len(scenarios), replace=False, size=100)
-toolbox.register("individual", tools.initIterate, creator.Individual, toolbox.attr_bool)
-toolbox.register("population", tools.initRepeat, list, toolbox.individual)
-
-def evaluate(individual):
-    selected_scenarios = [scenarios[i] for i in individual]
-    probability = np.mean([calculate_collision_probability(s) for s in selected_scenarios])
-    diversity = calculate_diversity(selected_scenarios)
-    intensity = np.mean([s["Intensity"] for s in selected_scenarios])
-    return probability, diversity, intensity
-
-toolbox.register("evaluate", evaluate)
-toolbox.register("mate", tools.cxTwoPoint)
-toolbox.register("mutate", tools.mutFlipBit, indpb=0.05)
-toolbox.register("select", tools.selNSGA2)
-
-# Number of generations
-NGEN = 50
-MU = 50
-LAMBDA = 100
-CXPB = 0.7
-MUTPB = 0.2
-
-population = toolbox.population(n=MU)
-algorithms.eaMuPlusLambda(population, toolbox, mu=MU, lambda_=LAMBDA, cxpb=CXPB, mutpb=MUTPB, ngen=NGEN, stats=None)
-fronts = tools.sortNondominated(population, len(population), first_front_only=False)
-
-unique_scenarios_idx = set()  # To keep track of unique scenario identifiers
-selected_scenarios = []  # To store the actual selected scenarios
-
-reached_target = False  # Flag to indicate when we've reached 100 unique scenarios
+# NSGA_WORKERS=<n> spreads large evaluation batches over n processes; the result is the same either way
+workers = int(os.environ.get("NSGA_WORKERS", 0)) or None
+
+# Rerunning after a crash or Ctrl-C resumes from the last checkpoint; it is removed once the run completes
+checkpoint_path = f"./nsga_checkpoint_{asil_choice.replace(' ', '_')}.pkl"
+# Per-generation hypervolume; the run stops early once it plateaus
+trace_path = f"./nsga_trace_{asil_choice.replace(' ', '_')}.jsonl"
+start_time = time.perf_counter()
+archive = ParetoArchive()  # Best subsets seen over the whole run
+population = run_nsga(pool, checkpoint_path=checkpoint_path, archive=archive, workers=workers,
+                      trace_path=trace_path)
+wall_time = time.perf_counter() - start_time
+if os.path.exists(checkpoint_path):  # Not written when the run ends before its first generation
+    os.remove(checkpoint_path)
 
 # User choice (could be input from command line or a GUI)
-user_choice = input("Enter your choice (vehicle/pedestrian): ")  # Other option could be "vehicle"
+user_choice = input("Enter your choice (vehicle/pedestrian): ").strip().lower()
+user_choice = "pedestrian" if user_choice == "pedestrian" else "vehicle"  # Anything else selects (and is logged as) vehicle
 
-# Filter function based on user choice
-filter_function = is_pedestrian_or_cyclist_collision if user_choice == "pedestrian" else is_vehicle_collision
-
-# Modified loop to consider only scenarios of a specific collision type
-for front in fronts:
-    for ind in front:
-        if reached_target:
-            break
-        
-        ind_scenarios = [scenarios[i] for i in ind if filter_function(scenarios[i])]  # Apply filter here
-        
-        for scenario in ind_scenarios:
-            if scenario['Scenario Name'] not in unique_scenarios_idx:
-                unique_scenarios_idx.add(scenario['Scenario Name'])
-                selected_scenarios.append(scenario)
-                
-                if len(selected_scenarios) >= 100:
-                    reached_target = True
-                    break
-
-    if reached_target:
-        break
+# Consider only scenarios of a specific collision type
+selected_indices = select_from_fronts(pool, population, pool.collision_mask(user_choice), archive=archive)
 
 # Save to JSON
 output_file_path = "./selected_scenarios.json"
 with open(output_file_path, 'w') as outfile:
-    json.dump(selected_scenarios, outfile, indent=4)
-
-# Read the selected scenarios from the JSON file
-with open(output_file_path, 'r') as infile:
-    selected_scenarios = json.load(infile)
+    json.dump(pool.to_records(selected_indices), outfile, indent=4)
 
 # Calculate the metrics for the selected scenarios
-# Note: The calculation functions and 'normalize' function are assumed to be defined as before
-
-# Calculate average collision probability
-average_probability = np.mean([calculate_collision_probability(scenario) for scenario in selected_scenarios])
-
-# Calculate diversity
-diversity = calculate_diversity(selected_scenarios)
-
-# Calculate average intensity
-average_intensity = np.mean([scenario["Intensity"] for scenario in selected_scenarios])
-
-# Collect the metrics in a dictionary
-metrics = {
-    "Average Collision Probability": average_probability,
-    "Diversity Index": diversity,
-    "Average Intensity": average_intensity
-}
+metrics = pool.metrics(selected_indices)
+average_probability = metrics["Average Collision Probability"]
+diversity = metrics["Diversity Index"]
+average_intensity = metrics["Average Intensity"]
 
 # Specify the file path for storing the results
-results_file_path = "./nsga2_results.json"
+results_file_path = "./nsga2_results.jsonl"
 
-# Save the metrics to the JSON file
-save_metrics_to_json(results_file_path, metrics)
+# Append the metrics and run metadata to the results log
+append_metrics(results_file_path, metrics, algorithm="NSGA-II", asil_filter=asil_choice, collision_type=user_choice,
+               wall_time=wall_time)
 
 print("Metrics saved to:", results_file_path)
 
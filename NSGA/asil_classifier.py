@@ -0,0 +1,140 @@
+"""Table-driven ASIL classification shared by the ASIL, NSGA and Random Search scripts.
+
+Severity and exposure are looked up from speed bins (np.searchsorted over the
+speed range edges) and the S x E x C -> ASIL mapping is a precomputed array, so
+whole columns of scenarios are classified in a handful of NumPy calls.
+"""
+import numpy as np
+
+# Global Speed Ranges (km/h): very low [0, 15), low [15, 50), medium [50, 115)
+SPEED_EDGES_KPH = np.array([0.0, 15.0, 50.0, 115.0])
+
+# Speed bins produced by speed_bins(): 0 = below range, 1 = very low, 2 = low, 3 = medium, 4 = above range / NaN
+N_SPEED_BINS = len(SPEED_EDGES_KPH) + 1
+
+WEATHERS = ("ClearNoon", "ClearNight", "HardRainNoon", "HardRainNight")
+UNKNOWN_WEATHER = -1
+
+COLLISION_CATEGORIES = ("Pedestrian", "NPC_VEHICLE", "Obstacle")
+PEDESTRIAN, NPC_VEHICLE, OBSTACLE = range(len(COLLISION_CATEGORIES))
+
+SEVERITY_CLASSES = ("S0", "S1", "S2", "S3", "Severity Not Defined")
+EXPOSURE_CLASSES = ("E0", "E1", "E2", "E3", "E4", "Exposure Not Defined")
+CONTROLLABILITY_CLASSES = ("C0", "C1", "C2", "C3")
+ASIL_LEVELS = ("QM", "ASIL A", "ASIL B", "ASIL C", "ASIL D", "ASIL Not Defined")
+
+SEVERITY_UNDEFINED = len(SEVERITY_CLASSES) - 1
+EXPOSURE_UNDEFINED = len(EXPOSURE_CLASSES) - 1
+ASIL_UNDEFINED = len(ASIL_LEVELS) - 1
+DEFAULT_CONTROLLABILITY = CONTROLLABILITY_CLASSES.index("C3")  # Assuming a default value; modify as needed
+
+
+def _codes(labels, table):
+    return np.array([table.index(label) for label in labels], dtype=np.int8)
+
+
+# Severity by [collision category, speed bin]
+SEVERITY_TABLE = np.vstack([
+    _codes(["Severity Not Defined", "S2", "S3", "S3", "Severity Not Defined"], SEVERITY_CLASSES),  # Pedestrian
+    _codes(["Severity Not Defined", "S1", "S2", "S3", "Severity Not Defined"], SEVERITY_CLASSES),  # NPC_VEHICLE
+    _codes(["S0", "S0", "S0", "S0", "S0"], SEVERITY_CLASSES),  # Obstacle
+])
+
+# Exposure by [weather code, speed bin]; hard rain raises exposure by one class
+_CLEAR_EXPOSURE = _codes(["Exposure Not Defined", "E1", "E2", "E3", "Exposure Not Defined"], EXPOSURE_CLASSES)
+_RAIN_EXPOSURE = _codes(["Exposure Not Defined", "E2", "E3", "E4", "Exposure Not Defined"], EXPOSURE_CLASSES)
+EXPOSURE_TABLE = np.vstack([
+    _CLEAR_EXPOSURE,  # ClearNoon
+    _CLEAR_EXPOSURE,  # ClearNight
+    _RAIN_EXPOSURE,  # HardRainNoon
+    _RAIN_EXPOSURE,  # HardRainNight
+    np.full(N_SPEED_BINS, EXPOSURE_UNDEFINED, dtype=np.int8),  # unknown weather
+])
+
+
+def _build_asil_table():
+    table = np.full((len(SEVERITY_CLASSES), len(EXPOSURE_CLASSES), len(CONTROLLABILITY_CLASSES)),
+                    ASIL_UNDEFINED, dtype=np.int8)
+    c3 = CONTROLLABILITY_CLASSES.index("C3")
+    rows = {
+        "S1": ["QM", "QM", "ASIL A", "ASIL B"],
+        "S2": ["QM", "ASIL A", "ASIL B", "ASIL C"],
+        "S3": ["ASIL A", "ASIL B", "ASIL C", "ASIL D"],
+    }
+    for severity, levels in rows.items():
+        for exposure, level in zip(("E1", "E2", "E3", "E4"), levels):
+            table[SEVERITY_CLASSES.index(severity), EXPOSURE_CLASSES.index(exposure), c3] = ASIL_LEVELS.index(level)
+    return table
+
+
+# ASIL by [severity, exposure, controllability]
+ASIL_TABLE = _build_asil_table()
+
+
+def convert_speed_mps_to_kph(speed_mps):
+    return np.asarray(speed_mps, dtype=np.float64) * 3.6  # 1 m/s = 3.6 km/h
+
+
+def categorize_collision(collision_type):
+    # Check collision_type to decide between pedestrian, vehicle, or obstacle
+    if "walker" in collision_type or "diamondback" in collision_type:
+        return PEDESTRIAN
+    elif "vehicle" in collision_type:
+        return NPC_VEHICLE
+    return OBSTACLE
+
+
+def encode_collision_types(collision_types):
+    return np.fromiter((categorize_collision(c) for c in collision_types), dtype=np.int8)
+
+
+_WEATHER_CODES = {weather: code for code, weather in enumerate(WEATHERS)}
+
+
+def encode_weathers(weathers):
+    return np.fromiter((_WEATHER_CODES.get(w, UNKNOWN_WEATHER) for w in weathers), dtype=np.int8)
+
+
+def speed_bins(speed_kph):
+    return np.searchsorted(SPEED_EDGES_KPH, speed_kph, side="right")
+
+
+def determine_severity(collision_codes, speed_kph):
+    return SEVERITY_TABLE[np.asarray(collision_codes, dtype=np.intp), speed_bins(speed_kph)]
+
+
+def determine_exposure(weather_codes, speed_kph):
+    # Unknown weather (-1) indexes the last, all-undefined row
+    return EXPOSURE_TABLE[np.asarray(weather_codes, dtype=np.intp), speed_bins(speed_kph)]
+
+
+def determine_asil(severity_codes, exposure_codes, controllability_codes=DEFAULT_CONTROLLABILITY):
+    return ASIL_TABLE[np.asarray(severity_codes, dtype=np.intp),
+                      np.asarray(exposure_codes, dtype=np.intp),
+                      np.asarray(controllability_codes, dtype=np.intp)]
+
+
+def classify(speed_mps, weather_codes, collision_codes, controllability_codes=DEFAULT_CONTROLLABILITY):
+    """Return ASIL level codes (indices into ASIL_LEVELS) for columns of scenarios."""
+    speed_kph = convert_speed_mps_to_kph(speed_mps)
+    severity = determine_severity(collision_codes, speed_kph)
+    exposure = determine_exposure(weather_codes, speed_kph)
+    return determine_asil(severity, exposure, controllability_codes)
+
+
+def asil_labels(asil_codes):
+    return np.asarray(ASIL_LEVELS, dtype=object)[np.asarray(asil_codes, dtype=np.intp)].tolist()
+
+
+def asil_code(asil_level):
+    return ASIL_LEVELS.index(asil_level)
+
+
+def classify_scenarios(scenarios):
+    """Classify a list of scenario dicts, returning one ASIL label per scenario."""
+    asil_codes = classify(
+        np.array([s["Speed at Collision"] for s in scenarios], dtype=np.float64),
+        encode_weathers(s["Weather"] for s in scenarios),
+        encode_collision_types(s["Collision Type"] for s in scenarios),
+    )
+    return asil_labels(asil_codes)
@@ -0,0 +1,346 @@
+"""Whole-population fitness evaluation and the (mu + lambda) loop that drives it.
+
+BatchEvaluator scores every individual of a population in a handful of NumPy
+calls: the population becomes an (n_individuals x k) index matrix, the three
+objectives are gathered from the ScenarioPool columns and reduced along axis 1.
+IncrementalEvaluator keeps those sums on the individuals, so a mutant that
+swapped m scenarios is rescored in O(m) rather than O(k).
+
+Checkpoint snapshots a running (mu + lambda) loop so an interrupted run
+resumes from its last snapshot and ends exactly where an uninterrupted one
+would have. HypervolumeStall ends a run early once the per-generation
+hypervolume in its logbook stops improving.
+"""
+import json
+import os
+import pickle
+import random
+from collections import OrderedDict
+import numpy as np
+from deap import tools
+from deap.algorithms import varOr
+
+
+class BatchEvaluator:
+    """Computes (mean probability, diversity, mean intensity) for whole populations.
+
+    All three objectives follow from per-subset sums (STATISTICS), so they are
+    computed in two steps: statistics() gathers and sums the per-scenario rows,
+    objectives() turns the sums into objective values.
+    """
+
+    STATISTICS = 8  # probability, attribute sums (3), attribute sums of squares (3), intensity
+
+    def __init__(self, pool):
+        self.pool = pool
+        # Diversity attributes as one (n_scenarios x 3) matrix, shifted by the pool mean so
+        # the sums of squares below do not cancel catastrophically on large intensities
+        attributes = np.column_stack([pool.speed, pool.time_to_collision, pool.intensity])
+        self.attributes = attributes - attributes.mean(axis=0) if len(pool) else attributes
+        self.rows = np.column_stack([pool.probability, self.attributes, self.attributes ** 2, pool.intensity])
+        # A NaN can be added to a running sum but never subtracted out of it again
+        self.finite = np.isfinite(self.rows).all(axis=1)
+
+    def statistics(self, individuals):
+        """Return an (n_individuals x STATISTICS) array of per-subset sums."""
+        # Sorted rows make the result independent of scenario order, bit for bit
+        index_matrix = np.sort(np.asarray(individuals, dtype=np.intp), axis=-1)
+        if index_matrix.size == 0:
+            return np.zeros((len(index_matrix), self.STATISTICS))
+        return self.rows[index_matrix].sum(axis=1)
+
+    def objectives(self, statistics, k):
+        """Return an (n x 3) array of objective values from per-subset sums of k scenarios."""
+        statistics = np.asarray(statistics, dtype=np.float64).reshape(-1, self.STATISTICS)
+        if k == 0:
+            return np.empty((len(statistics), 3))
+        means = statistics[:, 1:4] / k
+        variances = np.maximum(statistics[:, 4:7] / k - means ** 2, 0.0)
+        return np.column_stack([statistics[:, 0] / k, np.sqrt(variances).sum(axis=1), statistics[:, 7] / k])
+
+    def swap_statistics(self, removed, added):
+        """Change in the sums when `removed` scenarios leave a subset and `added` ones join it,
+        or None if it cannot be applied incrementally."""
+        if not self.finite[removed].all():
+            return None
+        return self.rows[added].sum(axis=0) - self.rows[removed].sum(axis=0)
+
+    def __call__(self, individuals):
+        """Return an (n_individuals x 3) array of objective values."""
+        individuals = np.asarray(individuals, dtype=np.intp)
+        return self.objectives(self.statistics(individuals), individuals.shape[-1] if individuals.ndim == 2 else 0)
+
+
+class IncrementalEvaluator:
+    """Population evaluator that keeps each individual's sums on the individual.
+
+    A mutant that only swapped scenarios (subsets.mut_swap records them in
+    `swaps`) is scored from its parent's sums in O(swaps); other individuals
+    are summed from scratch through `statistics`, usually a FitnessCache in
+    front of BatchEvaluator.statistics. Sums carried on individuals never go
+    into the cache, so cached values do not depend on the path that reached them.
+    """
+
+    def __init__(self, evaluator, statistics=None):
+        self.evaluator = evaluator
+        self.statistics = statistics or evaluator.statistics
+        self.incremental = 0
+        self.full = 0
+
+    def __call__(self, individuals):
+        if not len(individuals):
+            return np.empty((0, 3))
+        statistics = np.empty((len(individuals), self.evaluator.STATISTICS))
+        fresh = []
+        for row, ind in enumerate(individuals):
+            attributes = getattr(ind, "__dict__", {})
+            parent, swaps = attributes.get("statistics"), attributes.get("swaps")
+            change = 0.0 if swaps is None or parent is None else self.evaluator.swap_statistics(*swaps)
+            if parent is None or change is None:
+                fresh.append(row)
+            else:
+                statistics[row] = parent + change
+        if fresh:
+            statistics[fresh] = self.statistics([individuals[row] for row in fresh])
+        self.incremental += len(individuals) - len(fresh)
+        self.full += len(fresh)
+
+        for ind, row in zip(individuals, statistics):
+            if hasattr(ind, "__dict__"):
+                ind.statistics = row
+                ind.swaps = None
+        return self.evaluator.objectives(statistics, len(individuals[0]))
+
+    def info(self):
+        return f"Evaluations: {self.incremental} incremental, {self.full} from scratch"
+
+
+class FitnessCache:
+    """Bounded LRU cache in front of a population evaluator.
+
+    The objectives do not depend on scenario order, so individuals are keyed by
+    their sorted scenario indices; permutations of a scored subset are hits.
+    """
+
+    def __init__(self, evaluate_population, maxsize=100000):
+        self.evaluate_population = evaluate_population
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+
+    def __call__(self, individuals):
+        index_matrix = np.sort(np.asarray(individuals, dtype=np.intp), axis=-1)
+        fitnesses = [None] * len(index_matrix)
+        pending = OrderedDict()  # key -> rows waiting for that subset
+
+        for row, indices in enumerate(index_matrix):
+            key = indices.tobytes()
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                fitnesses[row] = cached
+                self.hits += 1
+            elif key in pending:
+                pending[key].append(row)
+                self.hits += 1
+            else:
+                pending[key] = [row]
+                self.misses += 1
+
+        if pending:
+            values = self.evaluate_population(index_matrix[[rows[0] for rows in pending.values()]])
+            for (key, rows), value in zip(pending.items(), values.tolist()):
+                value = tuple(value)
+                self._cache[key] = value
+                for row in rows:
+                    fitnesses[row] = value
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+
+        return np.array(fitnesses, dtype=np.float64)
+
+    def info(self):
+        total = self.hits + self.misses
+        hit_rate = 100 * self.hits / total if total else 0.0
+        return f"Fitness cache: {self.hits} hits, {self.misses} misses ({hit_rate:.1f}% hit rate), {len(self._cache)} entries"
+
+
+def assign_fitnesses(individuals, evaluate_population):
+    """Evaluate the individuals with an invalid fitness in one batch; return how many were evaluated."""
+    invalid_ind = [ind for ind in individuals if not ind.fitness.valid]
+    if invalid_ind:
+        for ind, fit in zip(invalid_ind, evaluate_population(invalid_ind).tolist()):
+            ind.fitness.values = fit
+    return len(invalid_ind)
+
+
+def _rng_state(rng):
+    if isinstance(rng, np.random.Generator):
+        return rng.bit_generator.state
+    if rng is np.random:
+        return np.random.get_state()
+    return None
+
+
+def _set_rng_state(rng, state):
+    if isinstance(rng, np.random.Generator):
+        rng.bit_generator.state = state
+    elif rng is np.random:
+        np.random.set_state(state)
+
+
+class Checkpoint:
+    """Periodic on-disk snapshot of a (mu + lambda) run: generation, population, fitnesses,
+    logbook, hall of fame and the state of the `random` module and of `rng`.
+
+    `settings` (e.g. mu, lambda and the pool size) are stored with the snapshot and must match
+    on resume; ngen is not among them, so a finished run can be resumed with more generations.
+    """
+
+    def __init__(self, path, individual, every=5, rng=None, settings=None):
+        self.path = path
+        self.individual = individual
+        self.every = every
+        self.rng = rng
+        self.settings = dict(settings or {})
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def due(self, gen, ngen):
+        return gen == ngen or gen % self.every == 0
+
+    def save(self, gen, population, logbook, halloffame=None):
+        first = {}
+        state = {
+            "settings": self.settings,
+            "generation": gen,
+            "population": np.array(population),
+            "fitnesses": np.array([ind.fitness.values for ind in population]),
+            # varOr copies parents into the offspring without cloning, so one individual can fill several
+            # slots; selNSGA2's crowding distances depend on that sharing, so it is restored as well
+            "aliases": [first.setdefault(id(ind), i) for i, ind in enumerate(population)],
+            # Per-individual state other than the fitness, e.g. IncrementalEvaluator's sums
+            "attributes": [{name: value for name, value in getattr(ind, "__dict__", {}).items() if name != "fitness"}
+                           for ind in population],
+            "logbook": logbook,
+            "halloffame": halloffame,
+            "random_state": random.getstate(),
+            "rng_state": _rng_state(self.rng),
+        }
+        # Written next to the target and renamed over it, so a crash never leaves half a checkpoint
+        temporary_path = self.path + ".tmp"
+        with open(temporary_path, 'wb') as file:
+            pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, self.path)
+
+    def load(self):
+        """Restore the RNG states and return (generation, population, logbook, hall of fame)."""
+        with open(self.path, 'rb') as file:
+            state = pickle.load(file)
+        if state["settings"] != self.settings:
+            raise ValueError(f"Checkpoint {self.path} was written with {state['settings']}, not {self.settings}")
+        random.setstate(state["random_state"])
+        _set_rng_state(self.rng, state["rng_state"])
+        population = []
+        for i, (genes, values, alias, attributes) in enumerate(zip(state["population"], state["fitnesses"].tolist(),
+                                                                   state["aliases"], state["attributes"])):
+            if alias != i:
+                population.append(population[alias])
+                continue
+            ind = self.individual(genes)
+            ind.fitness.values = values
+            vars(ind).update(attributes)
+            population.append(ind)
+        return state["generation"], population, state["logbook"], state["halloffame"]
+
+
+class HypervolumeStall:
+    """Early-stopping test on a logbook: true once its "hypervolume" column has improved by no more
+    than `tolerance` over the last `patience` generations."""
+
+    def __init__(self, patience, tolerance=0.0):
+        self.patience = patience
+        self.tolerance = tolerance
+
+    def __call__(self, logbook):
+        hypervolumes = logbook.select("hypervolume")
+        return len(hypervolumes) > self.patience and \
+            hypervolumes[-1] - hypervolumes[-1 - self.patience] <= self.tolerance
+
+
+def write_trace(file_path, logbook):
+    """Write the logbook as JSON lines, one per generation."""
+    with open(file_path, 'w') as file:
+        for record in logbook:
+            file.write(json.dumps(record) + "\n")
+
+
+def ea_mu_plus_lambda(population, toolbox, mu, lambda_, cxpb, mutpb, ngen,
+                      stats=None, halloffame=None, verbose=__debug__, checkpoint=None, stop=None):
+    """Drop-in for deap.algorithms.eaMuPlusLambda that calls toolbox.evaluate_population
+    once per generation instead of toolbox.evaluate once per individual.
+
+    With a Checkpoint, the run resumes from it if it exists (population is then replaced)
+    and a snapshot is written every `checkpoint.every` generations and after the last one.
+    `stop(logbook)` (e.g. HypervolumeStall) is asked before every generation and ends the run
+    when true; the last generation is then snapshotted too.
+    """
+    if checkpoint is not None and checkpoint.exists():
+        start_gen, population[:], logbook, saved_halloffame = checkpoint.load()
+        saved_gen = start_gen
+        if halloffame is not None and saved_halloffame is not None:
+            vars(halloffame).update(vars(saved_halloffame))
+        elif halloffame is not None:
+            halloffame.update(population)
+        if verbose:
+            print(f"Resumed from {checkpoint.path} at generation {start_gen}")
+    else:
+        start_gen = 0
+        saved_gen = None  # The initial population is not written
+        logbook = tools.Logbook()
+        logbook.header = ['gen', 'nevals'] + (stats.fields if stats else [])
+
+        nevals = assign_fitnesses(population, toolbox.evaluate_population)
+
+        if halloffame is not None:
+            halloffame.update(population)
+
+        record = stats.compile(population) if stats is not None else {}
+        logbook.record(gen=0, nevals=nevals, **record)
+        if verbose:
+            print(logbook.stream)
+
+    # Begin the generational process
+    for gen in range(start_gen + 1, ngen + 1):
+        if stop is not None and stop(logbook):
+            if verbose:
+                print(f"Stopped early after generation {gen - 1}")
+            if checkpoint is not None and saved_gen != gen - 1:
+                checkpoint.save(gen - 1, population, logbook, halloffame)
+            break
+
+        # Vary the population
+        offspring = varOr(population, toolbox, lambda_, cxpb, mutpb)
+
+        nevals = assign_fitnesses(offspring, toolbox.evaluate_population)
+
+        # Update the hall of fame with the generated individuals
+        if halloffame is not None:
+            halloffame.update(offspring)
+
+        # Select the next generation population
+        population[:] = toolbox.select(population + offspring, mu)
+
+        # Update the statistics with the new population
+        record = stats.compile(population) if stats is not None else {}
+        logbook.record(gen=gen, nevals=nevals, **record)
+        if verbose:
+            print(logbook.stream)
+
+        if checkpoint is not None and checkpoint.due(gen, ngen):
+            checkpoint.save(gen, population, logbook, halloffame)
+            saved_gen = gen
+
+    return population, logbook
@@ -0,0 +1,135 @@
+"""NSGA-II selection of critical scenarios from a ScenarioPool."""
+from contextlib import ExitStack
+import numpy as np
+from deap import base, creator, tools
+from evolution import (BatchEvaluator, Checkpoint, FitnessCache, HypervolumeStall, IncrementalEvaluator,
+                       ea_mu_plus_lambda, write_trace)
+from parallel import ParallelMap, ParallelStatistics
+from pareto import HypervolumeIndicator, sel_nsga2, sort_nondominated
+from subsets import cx_subset, mut_swap, random_subset, repaired
+
+# Define the problem object
+if not hasattr(creator, "FitnessMulti"):
+    creator.create("FitnessMulti", base.Fitness, weights=(1.0, 1.0, 1.0)) # Maximize probability and intensity, minimize (maximize negative) diversity
+    # A sorted int32 array of SUBSET_SIZE distinct scenario indices (see subsets.py)
+    creator.create("Individual", np.ndarray, fitness=creator.FitnessMulti)
+
+# Number of generations
+NGEN = 50
+MU = 50
+LAMBDA = 100
+CXPB = 0.7
+MUTPB = 0.2
+SUBSET_SIZE = 100
+CACHE_SIZE = 100000
+CHECKPOINT_EVERY = 5
+# Stop once the normalized hypervolume has gained no more than HV_TOLERANCE in PATIENCE generations
+PATIENCE = 10
+HV_TOLERANCE = 1e-4
+
+
+def build_toolbox(pool, rng=np.random, cache_size=CACHE_SIZE, parallel_map=None):
+    toolbox = base.Toolbox()
+
+    # Individual generation
+    toolbox.register("subset", random_subset, len(pool), SUBSET_SIZE, rng)
+    toolbox.register("individual", tools.initIterate, creator.Individual, toolbox.subset)
+    toolbox.register("population", tools.initRepeat, list, toolbox.individual)
+
+    # Whole-population evaluation: mutants are rescored from their parent's sums, other subsets not
+    # seen before are summed in one batch of NumPy gathers per generation
+    evaluator = BatchEvaluator(pool)
+    statistics = evaluator.statistics
+    if parallel_map is not None:
+        # Large batches are summed in the worker processes of a parallel.ParallelMap
+        toolbox.register("map", parallel_map)
+        statistics = toolbox.parallel_statistics = ParallelStatistics(evaluator, parallel_map)
+    toolbox.fitness_cache = FitnessCache(statistics, maxsize=cache_size)
+    toolbox.incremental_evaluator = IncrementalEvaluator(evaluator, toolbox.fitness_cache)
+    toolbox.register("evaluate_population", toolbox.incremental_evaluator)
+    # Set-aware variation: offspring are always SUBSET_SIZE distinct scenarios
+    toolbox.register("mate", cx_subset, rng=rng)
+    toolbox.register("mutate", mut_swap, n=len(pool), indpb=0.05, rng=rng)
+    toolbox.decorate("mate", repaired(len(pool), SUBSET_SIZE, rng))
+    toolbox.decorate("mutate", repaired(len(pool), SUBSET_SIZE, rng))
+    toolbox.register("select", sel_nsga2)
+    return toolbox
+
+
+def objective_bounds(pool):
+    """Lower and upper bounds of the three objectives over every subset of the pool: the means lie
+    within the column ranges, and each attribute's standard deviation within half its range."""
+    ranges = [np.ptp(column) if len(column) else 0.0 for column in (pool.speed, pool.time_to_collision, pool.intensity)]
+    probability = pool.probability[np.isfinite(pool.probability)]
+    lower = [probability.min() if len(probability) else 0.0, 0.0, pool.intensity.min() if len(pool) else 0.0]
+    upper = [probability.max() if len(probability) else 0.0, sum(ranges) / 2, pool.intensity.max() if len(pool) else 0.0]
+    return lower, upper
+
+
+def hypervolume_stats(pool):
+    """Statistics recording each generation's hypervolume, normalized by objective_bounds(pool)."""
+    stats = tools.Statistics(key=lambda ind: ind.fitness.values)
+    stats.register("hypervolume", HypervolumeIndicator(*objective_bounds(pool)))
+    return stats
+
+
+def run_nsga(pool, rng=np.random, ngen=NGEN, mu=MU, lambda_=LAMBDA, cxpb=CXPB, mutpb=MUTPB,
+             cache_size=CACHE_SIZE, verbose=__debug__, checkpoint_path=None, checkpoint_every=CHECKPOINT_EVERY,
+             archive=None, workers=None, patience=PATIENCE, tolerance=HV_TOLERANCE, trace_path=None):
+    """Evolve a population of scenario subsets and return the final population.
+
+    Parent choice and selection draw from the global `random` module as in
+    DEAP; `rng` drives the initial population, crossover and mutation. With checkpoint_path the run is
+    snapshotted every checkpoint_every generations and resumed from the
+    snapshot if one exists, giving the same result as an uninterrupted run.
+    An `archive` (pareto.ParetoArchive) is updated with every generation.
+    With `workers`, large evaluation batches are spread over that many
+    processes (parallel.py); the result is the same as a serial run.
+    The population's hypervolume is logged every generation, and the run stops early once it
+    gains no more than `tolerance` in `patience` generations (patience=None runs all ngen).
+    trace_path receives the per-generation log as JSON lines.
+    """
+    with ExitStack() as stack:
+        parallel_map = stack.enter_context(ParallelMap(pool, workers)) if workers else None
+        toolbox = build_toolbox(pool, rng, cache_size, parallel_map)
+        checkpoint = None
+        if checkpoint_path is not None:
+            settings = {"pool size": len(pool), "subset size": SUBSET_SIZE, "mu": mu, "lambda": lambda_,
+                        "cxpb": cxpb, "mutpb": mutpb, "patience": patience, "tolerance": tolerance}
+            checkpoint = Checkpoint(checkpoint_path, creator.Individual, checkpoint_every, rng, settings)
+        population = [] if checkpoint is not None and checkpoint.exists() else toolbox.population(n=mu)
+        stop = HypervolumeStall(patience, tolerance) if patience is not None else None
+        _, logbook = ea_mu_plus_lambda(population, toolbox, mu=mu, lambda_=lambda_, cxpb=cxpb, mutpb=mutpb,
+                                       ngen=ngen, stats=hypervolume_stats(pool), halloffame=archive, verbose=verbose,
+                                       checkpoint=checkpoint, stop=stop)
+        if trace_path is not None:
+            write_trace(trace_path, logbook)
+        if verbose:
+            print(toolbox.incremental_evaluator.info())
+            print(toolbox.fitness_cache.info())
+            if parallel_map is not None:
+                print(toolbox.parallel_statistics.info())
+    return population
+
+
+def select_from_fronts(pool, population, collision_mask, k=SUBSET_SIZE, archive=None):
+    """Walk the non-dominated fronts and collect up to k scenarios of the wanted collision type
+    with unique scenario names. With an archive, its subsets (the best seen over the whole run)
+    are walked first, then the fronts of the final population."""
+    fronts = sort_nondominated(population, len(population), first_front_only=False)
+    if archive is not None:
+        fronts = [[indices for indices, _ in archive.members()]] + fronts
+
+    unique_scenarios_idx = set()  # To keep track of unique scenario identifiers
+    selected_indices = []  # To store the indices of the selected scenarios
+
+    for front in fronts:
+        for ind in front:
+            for i in ind:
+                if collision_mask[i] and pool.names[i] not in unique_scenarios_idx:
+                    unique_scenarios_idx.add(pool.names[i])
+                    selected_indices.append(i)
+
+                    if len(selected_indices) >= k:
+                        return selected_indices
+    return selected_indices
@@ -0,0 +1,79 @@
+"""Process-pool evaluation inside a single NSGA-II run.
+
+ParallelMap is a toolbox.map backed by a persistent ProcessPoolExecutor whose
+workers attach to the scenario pool once, through shared memory
+(shared_pool.py), and keep a BatchEvaluator of it. ParallelStatistics splits a
+batch of subsets into one chunk per worker and sums them there; batches too
+small to pay for the round trip are summed in-process. Workers run the same
+BatchEvaluator code on the same columns, so results are bit-for-bit those of
+a serial run. Workers are forked where the platform allows it, so the
+top-level NSGA scripts (which have no main guard) can use it.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from evolution import BatchEvaluator
+from shared_pool import SharedPool, attach_pool
+
+# Scenarios gathered per batch (subsets x subset size) below which evaluation stays in-process
+MIN_PARALLEL_SCENARIOS = 200000
+
+# Per-worker evaluator, built once by the pool initializer
+_evaluator = None
+
+
+def _attach_evaluator(handle):
+    global _evaluator
+    _evaluator = BatchEvaluator(attach_pool(handle))
+
+
+def worker_statistics(index_matrix):
+    return _evaluator.statistics(index_matrix)
+
+
+class ParallelMap:
+    """toolbox.map over a persistent pool of `workers` processes preloaded with `pool`."""
+
+    def __init__(self, pool, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.shared = SharedPool(pool)
+        context = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else None)
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                            initializer=_attach_evaluator, initargs=(self.shared.handle,))
+
+    def __call__(self, function, *iterables, chunksize=1):
+        return list(self.executor.map(function, *iterables, chunksize=chunksize))
+
+    def close(self):
+        self.executor.shutdown()
+        self.shared.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ParallelStatistics:
+    """Drop-in for BatchEvaluator.statistics that sums large batches in the ParallelMap's workers."""
+
+    def __init__(self, evaluator, parallel_map, min_scenarios=MIN_PARALLEL_SCENARIOS):
+        self.evaluator = evaluator
+        self.map = parallel_map
+        self.min_scenarios = min_scenarios
+        self.parallel = 0
+        self.serial = 0
+
+    def __call__(self, individuals):
+        index_matrix = np.asarray(individuals, dtype=np.intp)
+        chunks = min(self.map.workers, len(index_matrix))
+        if chunks < 2 or index_matrix.size < self.min_scenarios:
+            self.serial += 1
+            return self.evaluator.statistics(index_matrix)
+        self.parallel += 1
+        return np.concatenate(self.map(worker_statistics, np.array_split(index_matrix, chunks)))
+
+    def info(self):
+        return f"Evaluation batches: {self.parallel} in {self.map.workers} worker processes, {self.serial} in-process"
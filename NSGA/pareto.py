@@ -0,0 +1,212 @@
+"""Fast non-dominated sorting for three objectives and an external Pareto archive.
+
+nondominated_ranks sweeps the points in decreasing lexicographic order, so
+every point already swept either dominates the current one or is
+incomparable with it. Each front keeps the staircase of its points' second and
+third objectives, which answers "does this front dominate p" with one
+bisection; a point dominated by front f is dominated by every earlier front
+too, so its front is found by binary search over the fronts. That is
+O(n log n log F) instead of the O(n^2) pairwise comparisons of
+tools.sortNondominated.
+
+hypervolume uses the same staircase: sweeping the points down the third
+objective, the volume dominated so far grows by the staircase's area times
+each step in the third objective, and the area is updated as points join.
+"""
+import bisect
+from itertools import chain
+from operator import attrgetter
+import numpy as np
+from deap.tools.emo import assignCrowdingDist
+
+ARCHIVE_SIZE = 1000
+
+
+class _Staircase:
+    """2D maxima of the points added so far: x strictly increasing, y strictly decreasing."""
+
+    def __init__(self):
+        self.xs = []
+        self.ys = []
+
+    def dominates(self, x, y):
+        # The first point with x' >= x has the largest y' of all of them
+        i = bisect.bisect_left(self.xs, x)
+        return i < len(self.xs) and self.ys[i] >= y
+
+    def add(self, x, y):
+        i = bisect.bisect_left(self.xs, x)
+        end = i + 1 if i < len(self.xs) and self.xs[i] == x else i
+        start = i
+        while start > 0 and self.ys[start - 1] <= y:
+            start -= 1
+        self.xs[start:end] = [x]
+        self.ys[start:end] = [y]
+
+
+def nondominated_ranks(values):
+    """Front number (0 = non-dominated) of each row of an (n x 3) array of objectives, all maximized."""
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) == 0:
+        return np.empty(0, dtype=np.intp)
+    # Identical points do not dominate each other; they are ranked once and share the rank
+    unique, inverse = np.unique(values, axis=0, return_inverse=True)
+    ranks = np.empty(len(unique), dtype=np.intp)
+    fronts = []
+    rows = unique[:, 1:].tolist()
+    for i in range(len(unique) - 1, -1, -1):
+        x, y = rows[i]
+        low, high = 0, len(fronts)
+        while low < high:
+            middle = (low + high) // 2
+            if fronts[middle].dominates(x, y):
+                low = middle + 1
+            else:
+                high = middle
+        if low == len(fronts):
+            fronts.append(_Staircase())
+        fronts[low].add(x, y)
+        ranks[i] = low
+    return ranks[inverse.reshape(-1)]
+
+
+def hypervolume(values, reference):
+    """Exact volume dominated by the rows of an (n x 3) array of objectives, all maximized, and
+    bounded below by the `reference` point. Rows not above the reference in every objective add nothing."""
+    values = np.asarray(values, dtype=np.float64).reshape(-1, 3)
+    x0, y0, z0 = np.asarray(reference, dtype=np.float64).tolist()
+    values = values[(values > [x0, y0, z0]).all(axis=1)]
+    rows = values[np.argsort(-values[:, 2], kind="stable")].tolist()
+    xs, ys = [], []
+    area = volume = 0.0
+    for i, (x, y, z) in enumerate(rows):
+        j = bisect.bisect_left(xs, x)
+        if not (j < len(xs) and ys[j] >= y):
+            end = j + 1 if j < len(xs) and xs[j] == x else j
+            start = j
+            while start > 0 and ys[start - 1] <= y:
+                start -= 1
+            # Each staircase point covers the strip between its left neighbour and itself; the strips of
+            # the replaced points and of the next point to the right change
+            stop = min(end + 1, len(xs))
+            area -= sum((xs[t] - (xs[t - 1] if t else x0)) * (ys[t] - y0) for t in range(start, stop))
+            area += (x - (xs[start - 1] if start else x0)) * (y - y0)
+            if end < len(xs):
+                area += (xs[end] - x) * (ys[end] - y0)
+            xs[start:end] = [x]
+            ys[start:end] = [y]
+        volume += area * (z - (rows[i + 1][2] if i + 1 < len(rows) else z0))
+    return volume
+
+
+class HypervolumeIndicator:
+    """Hypervolume of objective vectors rescaled by fixed bounds to the unit cube, with the lower
+    corner as reference point, so values from different generations (and runs on one pool) compare."""
+
+    def __init__(self, lower, upper):
+        self.lower = np.asarray(lower, dtype=np.float64)
+        span = np.asarray(upper, dtype=np.float64) - self.lower
+        self.span = np.where(span > 0, span, 1.0)
+
+    def __call__(self, values):
+        values = np.asarray(values, dtype=np.float64).reshape(-1, len(self.lower))
+        return hypervolume((values - self.lower) / self.span, np.zeros(len(self.lower)))
+
+
+def sort_nondominated(individuals, k, first_front_only=False):
+    """Drop-in for tools.sortNondominated: the fronts holding the best k individuals, front members
+    in population order."""
+    if k == 0 or not individuals:
+        return []
+    ranks = nondominated_ranks([ind.fitness.wvalues for ind in individuals])
+    fronts = [[] for _ in range(ranks.max() + 1)]
+    for ind, rank in zip(individuals, ranks.tolist()):
+        fronts[rank].append(ind)
+    if first_front_only:
+        return fronts[:1]
+    selected = 0
+    for count, front in enumerate(fronts, start=1):
+        selected += len(front)
+        if selected >= k:
+            return fronts[:count]
+    return fronts
+
+
+def sel_nsga2(individuals, k):
+    """tools.selNSGA2 on top of sort_nondominated."""
+    pareto_fronts = sort_nondominated(individuals, k)
+    for front in pareto_fronts:
+        assignCrowdingDist(front)
+
+    chosen = list(chain(*pareto_fronts[:-1]))
+    k = k - len(chosen)
+    if k > 0:
+        sorted_front = sorted(pareto_fronts[-1], key=attrgetter("fitness.crowding_dist"), reverse=True)
+        chosen.extend(sorted_front[:k])
+    return chosen
+
+
+def crowding_distances(values):
+    """NSGA-II crowding distance of each row of an (n x m) objective array (boundary rows are inf)."""
+    values = np.asarray(values, dtype=np.float64)
+    n, m = values.shape
+    distances = np.zeros(n)
+    if n == 0:
+        return distances
+    for i in range(m):
+        order = np.argsort(values[:, i], kind="stable")
+        column = values[order, i]
+        distances[order[[0, -1]]] = np.inf
+        if column[-1] == column[0]:
+            continue
+        distances[order[1:-1]] += (column[2:] - column[:-2]) / (m * (column[-1] - column[0]))
+    return distances
+
+
+class ParetoArchive:
+    """Non-dominated scenario subsets seen over a whole run, as sorted index arrays with their objectives.
+
+    It has the hall-of-fame interface (update(population)), so it can be passed as `halloffame` to
+    ea_mu_plus_lambda; beyond maxsize the most crowded members are dropped.
+    """
+
+    def __init__(self, weights=(1.0, 1.0, 1.0), maxsize=ARCHIVE_SIZE):
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.maxsize = maxsize
+        self.genes = []
+        self.values = np.empty((0, len(self.weights)))
+        self._keys = set()
+
+    def __len__(self):
+        return len(self.genes)
+
+    def update(self, population):
+        genes, values = list(self.genes), self.values.tolist()
+        for ind in population:
+            if not ind.fitness.valid:
+                continue
+            indices = np.sort(np.asarray(ind, dtype=np.intp))
+            key = indices.tobytes()
+            if key not in self._keys:
+                self._keys.add(key)
+                genes.append(indices)
+                values.append(ind.fitness.values)
+        if len(genes) == len(self.genes):
+            return
+
+        values = np.array(values, dtype=np.float64).reshape(len(genes), len(self.weights))
+        keep = np.flatnonzero(nondominated_ranks(values * self.weights) == 0)
+        if self.maxsize is not None and len(keep) > self.maxsize:
+            # Drop the most crowded one at a time so the distances stay right for the rest
+            keep = list(keep)
+            while len(keep) > self.maxsize:
+                del keep[int(np.argmin(crowding_distances(values[keep])))]
+            keep = np.array(keep)
+        self.genes = [genes[i] for i in keep]
+        self.values = values[keep]
+        self._keys = {indices.tobytes() for indices in self.genes}
+
+    def members(self):
+        """(indices, objective values) of every member, least crowded first."""
+        order = np.argsort(-crowding_distances(self.values), kind="stable")
+        return [(self.genes[i], tuple(self.values[i])) for i in order]
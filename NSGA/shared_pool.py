@@ -0,0 +1,91 @@
+"""Scenario pool columns in shared memory, for process pools.
+
+SharedPool copies a ScenarioPool's columns (speed, time to collision,
+intensity, collision probability, weather and collision codes, description
+codes and names as a fixed-width string column) into one
+multiprocessing.shared_memory block. Workers call attach_pool(handle) and get a
+ScenarioPool whose columns are read-only views into that block, so nothing is
+parsed or copied per worker and startup does not grow with the pool. The
+original records are not shared: workers hand back row indices and the owner
+calls to_records().
+
+The owner unlinks the block when its `with` block exits or at interpreter exit;
+if the owner is killed, multiprocessing's resource tracker unlinks it.
+
+    with SharedPool(load_pool(path)) as shared, \\
+            ProcessPoolExecutor(initializer=init, initargs=(shared.handle,)) as executor:
+        ...  # init calls attach_pool(handle)
+"""
+import atexit
+from multiprocessing import shared_memory
+import numpy as np
+from scenario_pool import ScenarioPool
+
+COLUMNS = ("speed", "time_to_collision", "intensity", "probability", "weather", "collision_category",
+           "description_codes", "names")
+ALIGNMENT = 64
+
+# Blocks attached by this process, by name; the views into a block need it kept open
+_attached = {}
+
+
+def _layout(columns):
+    layout, offset = [], 0
+    for column, values in columns.items():
+        offset = -(-offset // ALIGNMENT) * ALIGNMENT
+        layout.append((column, values.dtype.str, values.shape, offset))
+        offset += values.nbytes
+    return layout, offset
+
+
+def _views(memory, layout):
+    return {column: np.ndarray(shape, dtype, buffer=memory.buf, offset=offset)
+            for column, dtype, shape, offset in layout}
+
+
+class SharedPool:
+    """Owner of the shared memory block holding one pool's columns."""
+
+    def __init__(self, pool):
+        columns = {column: np.ascontiguousarray(getattr(pool, column)) for column in COLUMNS}
+        columns["names"] = np.asarray(pool.names, dtype=str)
+        layout, size = _layout(columns)
+        self.memory = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        atexit.register(self.close)
+        for column, view in _views(self.memory, layout).items():
+            view[...] = columns[column]
+        self.handle = {"name": self.memory.name, "layout": layout, "descriptions": list(pool.descriptions)}
+
+    def close(self):
+        """Release and unlink the block; safe to call more than once."""
+        if self.memory is None:
+            return
+        memory, self.memory = self.memory, None
+        atexit.unregister(self.close)
+        memory.close()
+        memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _open(name):
+    try:
+        # Python 3.13+: leave the block registered with the resource tracker by its owner only
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+def attach_pool(handle):
+    """ScenarioPool over the shared block described by SharedPool.handle (no records)."""
+    memory = _attached.get(handle["name"])
+    if memory is None:
+        memory = _attached[handle["name"]] = _open(handle["name"])
+    columns = _views(memory, handle["layout"])
+    for values in columns.values():
+        values.flags.writeable = False
+    return ScenarioPool(descriptions=handle["descriptions"], **columns)
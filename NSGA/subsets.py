@@ -0,0 +1,103 @@
+"""Fixed-size scenario subset genome and its variation operators.
+
+An individual is an int32 array of k distinct pool indices, kept sorted so that
+equal subsets are equal arrays. Crossover keeps the scenarios both parents
+share and deals the rest out between the children; mutation swaps members out
+for scenarios outside the subset. Both always yield k distinct valid indices,
+and `repaired` enforces it for any other operator. Mutation records the
+scenarios it swapped in `swaps` so IncrementalEvaluator (evolution.py) can
+update the parent's sums; crossover and repair drop the sums instead.
+
+Operators draw from a NumPy Generator (or the np.random module) passed as `rng`.
+"""
+from functools import wraps
+import numpy as np
+
+DTYPE = np.int32
+
+
+def _forget_statistics(ind):
+    attributes = getattr(ind, "__dict__", {})
+    attributes.pop("statistics", None)
+    attributes.pop("swaps", None)
+
+
+def random_subset(n, k, rng=np.random):
+    return np.sort(rng.choice(n, size=k, replace=False)).astype(DTYPE)
+
+
+def draw_outside(n, members, m, rng=np.random):
+    """m distinct indices in [0, n) that are not in `members`."""
+    members = np.asarray(members)
+    if m <= 0:
+        return np.empty(0, dtype=DTYPE)
+    if n - len(members) < m:
+        raise ValueError(f"Only {n - len(members)} scenarios outside the subset, cannot draw {m}")
+    if n < 2 * (len(members) + m):
+        # Dense subset: rejection would mostly miss, pick from the complement directly
+        return rng.choice(np.setdiff1d(np.arange(n), members), size=m, replace=False).astype(DTYPE)
+    drawn = np.empty(0, dtype=DTYPE)
+    while len(drawn) < m:
+        candidates = rng.choice(n, size=2 * (m - len(drawn)))
+        candidates = candidates[~np.isin(candidates, members) & ~np.isin(candidates, drawn)]
+        _, first = np.unique(candidates, return_index=True)
+        drawn = np.concatenate([drawn, candidates[np.sort(first)].astype(DTYPE)])
+    return drawn[:m]
+
+
+def repair(ind, n, k, rng=np.random):
+    """Make `ind` (in place) exactly k distinct indices in [0, n): out-of-range and repeated
+    entries are dropped and the gaps filled with random scenarios not already present."""
+    values = np.asarray(ind)
+    valid = values[(values >= 0) & (values < n)]
+    unique = np.unique(valid)
+    if len(unique) == k == len(values):
+        ind[:] = unique
+        return ind
+    _forget_statistics(ind)
+    if len(unique) > k:
+        unique = np.sort(rng.choice(unique, size=k, replace=False))
+    ind[:] = np.sort(np.concatenate([unique, draw_outside(n, unique, k - len(unique), rng)]))
+    return ind
+
+
+def repaired(n, k, rng=np.random):
+    """Decorator for toolbox.decorate that repairs every individual an operator returns."""
+    def decorator(operator):
+        @wraps(operator)
+        def wrapper(*args, **kwargs):
+            offspring = operator(*args, **kwargs)
+            for ind in offspring:
+                repair(ind, n, k, rng)
+            return offspring
+        return wrapper
+    return decorator
+
+
+def cx_subset(ind1, ind2, rng=np.random):
+    """Set crossover: both children keep the shared scenarios, and the scenarios only one parent
+    has are shuffled and split evenly between them."""
+    shared = np.intersect1d(ind1, ind2, assume_unique=True)
+    exclusive = rng.permutation(np.setxor1d(ind1, ind2, assume_unique=True))
+    half = len(ind1) - len(shared)
+    ind1[:] = np.sort(np.concatenate([shared, exclusive[:half]]))
+    ind2[:] = np.sort(np.concatenate([shared, exclusive[half:]]))
+    _forget_statistics(ind1)
+    _forget_statistics(ind2)
+    return ind1, ind2
+
+
+def mut_swap(ind, n, indpb, rng=np.random):
+    """Swap each member, with probability indpb, for a scenario outside the subset."""
+    m = min(rng.binomial(len(ind), indpb), n - len(ind))
+    if m:
+        out = rng.choice(len(ind), size=m, replace=False)
+        removed, added = np.asarray(ind[out]), draw_outside(n, ind, m, rng)
+        ind[out] = added
+        ind[:] = np.sort(ind)
+        attributes = getattr(ind, "__dict__", {})
+        if attributes.get("statistics") is not None:
+            swaps = attributes.get("swaps")
+            attributes["swaps"] = (removed, added) if swaps is None else \
+                (np.concatenate([swaps[0], removed]), np.concatenate([swaps[1], added]))
+    return ind,
@@ -0,0 +1,92 @@
+"""Random search selection of critical scenarios from a ScenarioPool.
+
+Candidates are visited in a shuffled index permutation. Diversity of the
+selection is tracked with running count / sum / sum-of-squares accumulators per
+attribute and the "better than any selected scenario" test with a running
+minimum score, so each candidate is judged in O(1).
+"""
+import math
+import numpy as np
+
+
+def calculate_scores(pool):
+    # Consider integrating the diversity factor directly into the score if diversity is a key factor
+    return pool.probability + pool.intensity
+
+
+class DiversityAccumulator:
+    """Running sum of per-attribute standard deviations of a growing selection."""
+
+    def __init__(self, n_attributes):
+        self.count = 0
+        self.sums = [0.0] * n_attributes
+        self.sums_of_squares = [0.0] * n_attributes
+
+    def diversity(self):
+        return self.diversity_with()
+
+    def diversity_with(self, values=None):
+        """Diversity of the selection, optionally as if `values` had been added to it."""
+        count = self.count + (values is not None)
+        if count == 0:
+            return 0.0
+        total = 0.0
+        for a, (s, sq) in enumerate(zip(self.sums, self.sums_of_squares)):
+            if values is not None:
+                s += values[a]
+                sq += values[a] * values[a]
+            mean = s / count
+            total += math.sqrt(max(sq / count - mean * mean, 0.0))
+        return total
+
+    def add(self, values):
+        self.count += 1
+        for a, value in enumerate(values):
+            self.sums[a] += value
+            self.sums_of_squares[a] += value * value
+
+
+def relaxed_selection(pool, selected_indices, k=100, rng=None):
+    """Fills up the selection to k scenarios with a more relaxed approach."""
+    rng = np.random.default_rng() if rng is None else rng
+    selected = np.zeros(len(pool), dtype=bool)
+    selected[selected_indices] = True
+    remaining_indices = rng.permutation(np.flatnonzero(~selected))  # Randomize the order of consideration
+    return selected_indices + remaining_indices[:k - len(selected_indices)].tolist()
+
+
+def select_scenarios(pool, k=100, rng=None):
+    """Return the indices of up to k scenarios chosen by random search."""
+    rng = np.random.default_rng() if rng is None else rng
+
+    # Attributes shifted by the pool mean so the sums of squares stay well conditioned
+    attributes = np.column_stack([pool.speed, pool.time_to_collision, pool.intensity])
+    if len(pool):
+        attributes = attributes - attributes.mean(axis=0)
+    attributes = attributes.tolist()
+    scores = calculate_scores(pool).tolist()
+
+    selected_indices = []
+    accumulator = DiversityAccumulator(3)
+    current_diversity = 0.0
+    min_score = math.inf
+
+    for candidate in rng.permutation(len(pool)).tolist():
+        if len(selected_indices) >= k:
+            break
+        values = attributes[candidate]
+        if selected_indices:  # Directly add the first scenario without comparison
+            better_than_any = min_score < scores[candidate]
+            # Keep the candidate only if it maintains or improves diversity and beats any selected scenario
+            if not (better_than_any and accumulator.diversity_with(values) >= current_diversity):
+                continue
+        selected_indices.append(candidate)
+        accumulator.add(values)
+        current_diversity = accumulator.diversity()
+        min_score = min(min_score, scores[candidate])
+
+    # If the selected scenarios are less than k, fill up the rest with remaining scenarios
+    if len(selected_indices) < k:
+        selected_indices = relaxed_selection(pool, selected_indices, k, rng)
+
+    return selected_indices
@@ -0,0 +1,215 @@
+"""Compact binary scenario store and the loader shared by the NSGA, Random Search and ASIL scripts.
+
+A store is a directory with one .npy column per field and a small manifest.
+Numeric columns load with np.load(mmap_mode='r'), string fields are
+dictionary-encoded (int32 codes plus a table of distinct values) and every row
+keeps the key layout of its original record, so a store converts back to the
+exact scenarios.json it came from.
+
+    python scenario_store.py scenarios.json scenarios.store   # JSON -> store
+    python scenario_store.py scenarios.store scenarios.json   # store -> JSON
+"""
+import argparse
+import json
+import os
+import re
+import numpy as np
+from asil_classifier import OBSTACLE, UNKNOWN_WEATHER, encode_collision_types, encode_weathers
+from scenario_pool import ScenarioPool
+
+FORMAT = "asil-gen-scenario-store"
+VERSION = 1
+MANIFEST = "manifest.json"
+LAYOUT_FILE = "layout.npy"
+
+# Placeholder stored for rows whose layout does not have the field
+_MISSING = {"bool": False, "int": 0, "float": np.nan, "number": np.nan, "string": -1}
+_DTYPES = {"bool": np.bool_, "int": np.int64, "float": np.float64, "number": np.float64, "string": np.int32}
+
+
+def _field_kind(values):
+    kinds = {type(v) for v in values}
+    if kinds <= {bool}:
+        return "bool"
+    if kinds <= {int}:
+        return "int"
+    if kinds <= {float}:
+        return "float"
+    if kinds <= {int, float}:
+        return "number"  # mixed ints and floats; an int mask restores the original type
+    if kinds <= {str}:
+        return "string"
+    raise ValueError(f"Unsupported value types in scenario field: {sorted(k.__name__ for k in kinds)}")
+
+
+def _slug(name):
+    return re.sub(r"[^0-9a-z]+", "_", name.lower()).strip("_")
+
+
+def write_store(records, path):
+    """Write a list of scenario records as a binary store directory."""
+    os.makedirs(path, exist_ok=True)
+    layouts = {}
+    layout_codes = np.fromiter((layouts.setdefault(tuple(r), len(layouts)) for r in records),
+                               dtype=np.int32, count=len(records))
+    field_names = list(dict.fromkeys(name for layout in layouts for name in layout))
+
+    fields = {}
+    for i, name in enumerate(field_names):
+        kind = _field_kind(r[name] for r in records if name in r)
+        stem = f"{i:02d}_{_slug(name)}"
+        entry = {"kind": kind, "file": stem + ".npy"}
+        if kind == "string":
+            table = {}
+            column = np.fromiter((table.setdefault(r[name], len(table)) if name in r else -1 for r in records),
+                                 dtype=np.int32, count=len(records))
+            entry["strings"] = stem + ".strings.json"
+            with open(os.path.join(path, entry["strings"]), 'w') as file:
+                json.dump(list(table), file)
+        else:
+            column = np.array([r.get(name, _MISSING[kind]) for r in records], dtype=_DTYPES[kind])
+            if kind == "number":
+                entry["int_mask"] = stem + ".int_mask.npy"
+                np.save(os.path.join(path, entry["int_mask"]),
+                        np.fromiter((type(r.get(name)) is int for r in records), dtype=np.bool_, count=len(records)))
+        np.save(os.path.join(path, entry["file"]), column)
+        fields[name] = entry
+
+    np.save(os.path.join(path, LAYOUT_FILE), layout_codes)
+    manifest = {
+        "format": FORMAT,
+        "version": VERSION,
+        "rows": len(records),
+        "layout": LAYOUT_FILE,
+        "layouts": [list(layout) for layout in layouts],
+        "fields": fields,
+    }
+    # The manifest goes last so a partially written store is never mistaken for a complete one
+    with open(os.path.join(path, MANIFEST), 'w') as file:
+        json.dump(manifest, file, indent=4)
+
+
+class ScenarioStore:
+    """Read-only view of a binary store; indexing returns scenario records as dicts."""
+
+    def __init__(self, path, rows=None):
+        self.path = path
+        with open(os.path.join(path, MANIFEST), 'r') as file:
+            self.manifest = json.load(file)
+        if self.manifest.get("format") != FORMAT or self.manifest.get("version") != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} scenario store")
+        self.fields = self.manifest["fields"]
+        self._layouts = [tuple(layout) for layout in self.manifest["layouts"]]
+        self._arrays = {}
+        self._strings = {}
+        self.rows = None if rows is None else np.asarray(rows, dtype=np.intp)
+
+    def _load(self, file_name):
+        if file_name not in self._arrays:
+            self._arrays[file_name] = np.load(os.path.join(self.path, file_name), mmap_mode='r')
+        return self._arrays[file_name]
+
+    def column(self, name):
+        """Memory-mapped column for a field over all rows of the store (string fields give codes)."""
+        return self._load(self.fields[name]["file"])
+
+    def strings(self, name):
+        """Distinct values of a string field, indexed by its codes."""
+        if name not in self._strings:
+            with open(os.path.join(self.path, self.fields[name]["strings"]), 'r') as file:
+                self._strings[name] = json.load(file)
+        return self._strings[name]
+
+    def __len__(self):
+        return self.manifest["rows"] if self.rows is None else len(self.rows)
+
+    def take(self, indices):
+        rows = np.asarray(indices, dtype=np.intp)
+        view = ScenarioStore.__new__(ScenarioStore)
+        view.__dict__.update(self.__dict__)
+        view.rows = rows if self.rows is None else self.rows[rows]
+        return view
+
+    def _value(self, name, row):
+        entry = self.fields[name]
+        value = self.column(name)[row]
+        kind = entry["kind"]
+        if kind == "string":
+            return self.strings(name)[value]
+        if kind == "number":
+            return int(value) if self._load(entry["int_mask"])[row] else float(value)
+        return {"bool": bool, "int": int, "float": float}[kind](value)
+
+    def __getitem__(self, i):
+        row = i if self.rows is None else self.rows[i]
+        layout = self._layouts[self._load(self.manifest["layout"])[row]]
+        return {name: self._value(name, row) for name in layout}
+
+    def to_records(self):
+        """Convert the whole store (or view) back to a list of record dicts, a column at a time."""
+        rows = slice(None) if self.rows is None else self.rows
+        values = {}
+        for name, entry in self.fields.items():
+            column = np.asarray(self.column(name)[rows])
+            if entry["kind"] == "string":
+                values[name] = np.asarray(self.strings(name) + [None], dtype=object)[column].tolist()
+            elif entry["kind"] == "number":
+                int_mask = np.asarray(self._load(entry["int_mask"])[rows])
+                values[name] = [int(v) if is_int else v for v, is_int in zip(column.tolist(), int_mask.tolist())]
+            else:
+                values[name] = column.tolist()
+        layout_codes = np.asarray(self._load(self.manifest["layout"])[rows]).tolist()
+        return [{name: values[name][i] for name in self._layouts[code]} for i, code in enumerate(layout_codes)]
+
+
+def pool_from_store(store):
+    """Build a ScenarioPool whose numeric columns stay memory-mapped from the store."""
+    # Map each distinct string once, then gather by code; code -1 (missing) hits the appended sentinel
+    weather_table = np.append(encode_weathers(store.strings("Weather")), UNKNOWN_WEATHER).astype(np.int8)
+    collision_table = np.append(encode_collision_types(store.strings("Collision Type")), OBSTACLE).astype(np.int8)
+    names = np.asarray(store.strings("Scenario Name") + [None], dtype=object)
+    return ScenarioPool(
+        speed=store.column("Speed at Collision"),
+        time_to_collision=store.column("Time to Collision"),
+        intensity=store.column("Intensity"),
+        weather=weather_table[store.column("Weather")],
+        collision_category=collision_table[store.column("Collision Type")],
+        names=names[store.column("Scenario Name")],
+        description_codes=store.column("Scenario Description"),
+        descriptions=store.strings("Scenario Description"),
+        records=store,
+    )
+
+
+def load_pool(path):
+    """Load a ScenarioPool from either a scenarios.json file or a binary store directory."""
+    if os.path.isdir(path):
+        return pool_from_store(ScenarioStore(path))
+    return ScenarioPool.from_json(path)
+
+
+def json_to_store(json_path, store_path):
+    with open(json_path, 'r') as file:
+        write_store(json.load(file), store_path)
+
+
+def store_to_json(store_path, json_path):
+    with open(json_path, 'w') as file:
+        json.dump(ScenarioStore(store_path).to_records(), file, indent=4)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert between scenarios.json and the binary scenario store.")
+    parser.add_argument("source", help="scenarios.json file or store directory")
+    parser.add_argument("destination")
+    args = parser.parse_args()
+
+    if os.path.isdir(args.source):
+        store_to_json(args.source, args.destination)
+    else:
+        json_to_store(args.source, args.destination)
+    print("Converted", args.source, "to", args.destination)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Generate scenario variations for any subset of the scenario types in scenario_specs.py.
+
+Each type is generated in its own process; within a process variations are
+rendered from a compiled template and streamed to a pool of writer threads.
+Numbering continues after the variations already in the output folder, so a
+new batch never overwrites an earlier one or reuses its class names.
+
+    python generate_scenarios.py change_lane vehicle_opens_door --num-variations 100000
+    python generate_scenarios.py --all --output-dir generated --seed 1
+    python generate_scenarios.py change_lane --sampling sobol --num-variations 1024
+"""
+import argparse
+import os
+import re
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from parameter_sampler import SAMPLING_METHODS, ParameterSampler
+from scenario_index import ParameterIndex
+from scenario_specs import SCENARIO_TYPES
+from scenario_template import compile_scenario, field
+from variation_writer import Progress, add_output_arguments, write_variations
+
+# Variations turned into Python rows at a time
+CHUNK_SIZE = 10000
+# Rounds of redraws for variations whose parameters are already in the index
+MAX_REDRAW_ROUNDS = 20
+
+
+def compile_templates(spec, original_code, original_xml):
+    class_name = spec["class_name"]
+    super_pattern, super_replacement = spec["super"]
+    renames = [
+        (rf'class\s+{class_name}\s*\(', f'class {class_name}_{field("n")}(', 0),
+        (super_pattern, super_replacement.replace("{n}", field("n")), 1),
+    ]
+    return compile_scenario(original_code, original_xml, spec["parameters"], renames,
+                            spec["scenario_name"], spec["xml_type"])
+
+
+def sample_rows(sampler, num_variations, rng, sampling="random", index=None):
+    """Yield dicts of parameter values. With an index, tuples already in it (or drawn earlier in
+    this batch) are skipped and redrawn; fewer are yielded if the parameter space runs out."""
+    remaining = num_variations
+    for _ in range(MAX_REDRAW_ROUNDS + 1):
+        # Each round is drawn as one design so stratified and low-discrepancy methods cover it evenly
+        batch_size = remaining
+        columns = sampler.sample(batch_size, rng, sampling)
+        for start in range(0, batch_size, CHUNK_SIZE):
+            chunk = {name: column[start:start + CHUNK_SIZE] for name, column in columns.items()}
+            for values in sampler.rows(chunk):
+                if index is None or index.add(values):
+                    remaining -= 1
+                    yield values
+        if remaining == 0:
+            return
+    print(f"Only {num_variations - remaining} of {num_variations} variations are new; "
+          f"the rest of the parameter space is already indexed")
+
+
+def next_variation_number(output_dir, spec):
+    """One past the highest variation number of a type already written to output_dir."""
+    highest = 0
+    for folder, name in (("scenarios", spec["code_name"]), ("examples", spec["xml_name"])):
+        pattern = re.compile(re.escape(name).replace(re.escape("{n}"), r"(\d+)") + "$")
+        folder = os.path.join(output_dir, folder)
+        for file_name in os.listdir(folder) if os.path.isdir(folder) else ():
+            match = pattern.match(file_name)
+            if match:
+                highest = max(highest, int(match.group(1)))
+    return highest + 1
+
+
+def generate_variations(spec, original_code, original_xml, num_variations, rng, sampling="random", index=None,
+                        first=1):
+    """Yield (variation number, code, xml) for num_variations variations of one scenario type,
+    numbered from `first`."""
+    code_template, xml_template = compile_templates(spec, original_code, original_xml)
+    sampler = ParameterSampler(spec["parameters"], spec.get("constraints", ()))
+    for n, values in enumerate(sample_rows(sampler, num_variations, rng, sampling, index), start=first):
+        values["n"] = n
+        if "weather" in values:
+            values["weather_part"] = values["weather"].split('.')[-1]
+        yield n, code_template.render(values), xml_template.render(values)
+
+
+def generate_type(type_name, scenario_runner, output_dir, num_variations, workers, seed=None, sampling="random",
+                  index_path=None):
+    spec = SCENARIO_TYPES[type_name]
+    srunner = os.path.join(scenario_runner, "srunner")
+    with open(os.path.join(srunner, "scenarios", spec["source"]), "r") as file:
+        original_code = file.read()
+    with open(os.path.join(srunner, "examples", spec["xml_source"]), "r") as file:
+        original_xml = file.read()
+
+    # Seeding with the type name keeps each type's stream the same whichever subset is generated
+    rng = np.random.default_rng(None if seed is None else [seed, zlib.crc32(type_name.encode())])
+    index = ParameterIndex(index_path, type_name) if index_path else None
+    output_dir = output_dir or srunner
+    variations = generate_variations(spec, original_code, original_xml, num_variations, rng, sampling, index,
+                                     first=next_variation_number(output_dir, spec))
+    written = write_variations(variations, output_dir, spec["code_name"], spec["xml_name"], workers,
+                               progress=Progress(f"{type_name} variations written"))
+    if index is not None:
+        index.save()
+    return written
+
+
+def main(default_types=()):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("types", nargs="*", metavar="type",
+                        help=f"scenario types to generate: {', '.join(SCENARIO_TYPES)}")
+    parser.add_argument("--all", action="store_true", help="generate every scenario type")
+    parser.add_argument("--processes", type=int, default=None, help="types generated at once (default: all cores)")
+    parser.add_argument("--seed", type=int, default=None, help="seed for reproducible variations")
+    parser.add_argument("--sampling", choices=SAMPLING_METHODS, default="random",
+                        help="random draws, Latin hypercube, or scrambled Sobol/Halton sequences")
+    parser.add_argument("--index", default=None,
+                        help="parameter index directory (see scenario_index.py); indexed tuples are skipped "
+                             "and redrawn, and the new ones are added to it")
+    add_output_arguments(parser)
+    args = parser.parse_args()
+
+    types = list(SCENARIO_TYPES) if args.all else (args.types or list(default_types))
+    if not types:
+        parser.error("name at least one scenario type or pass --all")
+    unknown = [type_name for type_name in types if type_name not in SCENARIO_TYPES]
+    if unknown:
+        parser.error(f"unknown scenario type(s): {', '.join(unknown)}")
+
+    jobs = [(type_name, args.scenario_runner, args.output_dir, args.num_variations, args.workers, args.seed,
+             args.sampling, args.index)
+            for type_name in dict.fromkeys(types)]
+    print("Generating variations...")
+    if len(jobs) == 1:
+        generate_type(*jobs[0])
+    else:
+        with ProcessPoolExecutor(max_workers=args.processes) as executor:
+            for future in [executor.submit(generate_type, *job) for job in jobs]:
+                future.result()
+    print("Variations generated successfully.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""On-disk index of scenario parameter tuples that were already generated or simulated.
+
+An index is a directory with two sorted arrays of 64-bit hashes per scenario
+type: <type>.npy holds full parameter tuples that were generated, and
+<type>.simulated.npy the tuples found in Scenario Results, projected on the
+parameters the results log (see "results" in scenario_specs.py; no type logs
+all of them). generate_scenarios.py --index skips and redraws a tuple that was
+generated before or whose projection was simulated, and adds the ones it
+writes. An index is filled from earlier variation files and from the archive:
+
+    python scenario_index.py generated.index --scan "Scenario Dataset/scenarios" --archive "../Scenario Results/Scenario Results.zip"
+
+Types whose results log no parameter besides the weather cannot be matched
+against the archive and are indexed from the variation files only.
+"""
+import argparse
+import ast
+import glob
+import hashlib
+import os
+import re
+import sys
+
+import numpy as np
+
+from scenario_specs import SCENARIO_TYPES
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_ARCHIVE = os.path.join(HERE, "..", "Scenario Results", "Scenario Results.zip")
+
+
+def canonical(value):
+    # carla.WeatherParameters.ClearNoon in generated code and ClearNoon in results are the same weather,
+    # and 5, 5.0 and 5.000000001 are the same distance
+    if isinstance(value, str):
+        return value.rsplit(".", 1)[-1]
+    # Rounded before the integer test, so a logged value times its scale (30.000000000000004) is 30
+    value = round(float(value), 6)
+    return int(value) if value.is_integer() else value
+
+
+def result_fields(spec):
+    """{parameter: (results field, scale)} for the parameters a type's results log."""
+    return {name: (entry, 1) if isinstance(entry, str) else tuple(entry)
+            for name, entry in spec["results"]["fields"].items()}
+
+
+def logged_values(record, fields):
+    """Parameter values logged in a results record (fields from result_fields), or None if one is missing."""
+    if any(field not in record for field, _ in fields.values()):
+        return None
+    return {name: record[field] if scale == 1 else record[field] * scale for name, (field, scale) in fields.items()}
+
+
+class _KeySet:
+    """Set of 64-bit keys, kept as a sorted array on disk plus the keys added since loading."""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.known = np.load(file_path) if os.path.exists(file_path) else np.empty(0, dtype=np.uint64)
+        self.added = set()
+
+    def __contains__(self, key):
+        if key in self.added:
+            return True
+        i = np.searchsorted(self.known, np.uint64(key))
+        return i < len(self.known) and self.known[i] == key
+
+    def __len__(self):
+        return len(self.known) + len(self.added)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+        merged = np.union1d(self.known, np.fromiter(self.added, dtype=np.uint64, count=len(self.added)))
+        temporary_path = self.file_path + ".tmp.npy"
+        np.save(temporary_path, merged)
+        os.replace(temporary_path, self.file_path)
+        self.known, self.added = merged, set()
+
+
+class ParameterIndex:
+    """Hashed parameter tuples of one scenario type: full tuples generated before, and the
+    projections on the logged parameters of tuples simulated before."""
+
+    def __init__(self, path, type_name):
+        spec = SCENARIO_TYPES[type_name]
+        self.type_name = type_name
+        self.names = list(spec["parameters"])
+        self.logged = [name for name in self.names if name in spec["results"]["fields"]]
+        self.generated = _KeySet(os.path.join(path, f"{type_name}.npy"))
+        self.simulated = _KeySet(os.path.join(path, f"{type_name}.simulated.npy"))
+
+    def key(self, values, names=None):
+        text = repr((self.type_name, tuple(canonical(values[name]) for name in names or self.names)))
+        return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "little")
+
+    def matches_results(self):
+        # A projection on the weather alone would match nearly every new tuple
+        return any(name != "weather" for name in self.logged)
+
+    def add(self, values):
+        """Record a generated parameter tuple; returns False if it was generated before or its
+        projection was simulated."""
+        key = self.key(values)
+        if key in self.generated or (self.matches_results() and self.key(values, self.logged) in self.simulated):
+            return False
+        self.generated.added.add(key)
+        return True
+
+    def add_simulated(self, values):
+        """Record the logged parameters of a simulated tuple; returns False if already recorded."""
+        key = self.key(values, self.logged)
+        if key in self.simulated:
+            return False
+        self.simulated.added.add(key)
+        return True
+
+    def __len__(self):
+        return len(self.generated)
+
+    def save(self):
+        self.generated.save()
+        self.simulated.save()
+
+
+def read_variation(code, spec):
+    """Parameter values assigned in a generated scenario file, or None if one is missing."""
+    values = {}
+    for name in spec["parameters"]:
+        match = re.search(rf"\b{re.escape(name)}\b\s*=\s*([^,\n]*)", code)
+        if match is None:
+            return None
+        text = match.group(1).strip()
+        try:
+            values[name] = ast.literal_eval(text)
+        except (ValueError, SyntaxError):
+            values[name] = text  # e.g. carla.WeatherParameters.ClearNoon
+    return values
+
+
+def scan_variations(index, directory):
+    """Add every variation of the index's type found in a folder of generated scenario files."""
+    spec = SCENARIO_TYPES[index.type_name]
+    # Older batches shared file names between types, so the class name decides the type
+    class_pattern = re.compile(rf"class\s+{spec['class_name']}_\d+\s*\(")
+    added = 0
+    for file_path in glob.glob(os.path.join(directory, spec["code_name"].replace("{n}", "*"))):
+        with open(file_path, "r") as file:
+            code = file.read()
+        if class_pattern.search(code):
+            values = read_variation(code, spec)
+            if values is not None and index.add(values):
+                added += 1
+    return added
+
+
+def add_results(index, records):
+    """Add simulated records of the index's type; returns the number of new projections, or None
+    if its results log no parameter besides the weather."""
+    if not index.matches_results():
+        return None
+    fields = result_fields(SCENARIO_TYPES[index.type_name])
+    added = 0
+    for record in records:
+        values = logged_values(record, fields)
+        if values is not None and index.add_simulated(values):
+            added += 1
+    return added
+
+
+def archive_records(archive_path, types):
+    """{results type: [records]} for the given scenario types, read with ingest_results.py."""
+    sys.path.insert(0, os.path.join(HERE, "..", "Scenario Results"))
+    from ingest_results import iter_member_records, scenario_type
+
+    wanted = {SCENARIO_TYPES[type_name]["results"]["type"] for type_name in types}
+    records = {result_type: [] for result_type in wanted}
+    for member_name, member_records, error in iter_member_records(archive_path, wanted):
+        if member_records is not None:
+            records[scenario_type(member_name)].extend(member_records)
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("index", help="index directory (created if missing)")
+    parser.add_argument("--types", nargs="+", default=list(SCENARIO_TYPES), choices=list(SCENARIO_TYPES))
+    parser.add_argument("--scan", nargs="+", default=[], help="folders of previously generated scenario files")
+    parser.add_argument("--archive", nargs="?", const=DEFAULT_ARCHIVE, default=None,
+                        help="Scenario Results zip archive (default path if given without a value)")
+    args = parser.parse_args()
+
+    records = archive_records(args.archive, args.types) if args.archive else {}
+    for type_name in args.types:
+        index = ParameterIndex(args.index, type_name)
+        for directory in args.scan:
+            print(f"{type_name}: {scan_variations(index, directory)} new tuples from {directory}")
+        if args.archive:
+            spec = SCENARIO_TYPES[type_name]
+            added = add_results(index, records.get(spec["results"]["type"], []))
+            if added is None:
+                print(f"{type_name}: archive skipped, results log no parameter besides the weather")
+            else:
+                print(f"{type_name}: {added} new simulated tuples from the archive "
+                      f"(matched on {', '.join(index.logged)})")
+        index.save()
+        print(f"{type_name}: {len(index)} generated and {len(index.simulated)} simulated tuples indexed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+"""Declarative description of every scenario type the generation engine can vary.
+
+Each spec names the scenario_runner files to read and write, the class and
+super() renames, the parameters with their domains, and any constraints
+between parameters. In renames and file names {n} is the variation number.
+Output names are unique per type (scenario_runner finds scenarios by class
+and type, not by file name), so every type can be written into one folder.
+"results" maps parameters to the fields scenario_runner logs for them in
+Scenario Results (folder "type"); parameters it does not log are left out. A
+(field, scale) pair marks a field logged in other units: the logged value
+times scale is the parameter value.
+"""
+
+
+def integer(low, high):
+    return {"kind": "int", "low": low, "high": high}
+
+
+def uniform(low, high, precision=2):
+    return {"kind": "float", "low": low, "high": high, "precision": precision}
+
+
+def choice(*options):
+    return {"kind": "choice", "options": list(options)}
+
+
+def at_most(param, other, offset=0):
+    """values[param] <= values[other] + offset"""
+    return {"kind": "at_most", "param": param, "other": other, "offset": offset}
+
+
+WEATHER = choice("carla.WeatherParameters.ClearNoon", "carla.WeatherParameters.HardRainNoon",
+                 "carla.WeatherParameters.ClearNight", "carla.WeatherParameters.HardRainNight")
+DESIRED_SPEED = integer(5, 116)
+
+
+def _super_rename(class_name, scenario_name):
+    return (rf'super\({class_name}, self\)\.__init__\("{scenario_name}",',
+            f'super({class_name}_{{n}}, self).__init__("{scenario_name}_{{n}}",')
+
+
+def _bare_super_rename(scenario_name):
+    return rf'super\(\)\.__init__\("{scenario_name}"', f'super().__init__("{scenario_name}_{{n}}"'
+
+
+SCENARIO_TYPES = {
+    "change_lane": {
+        "class_name": "ChangeLane",
+        "super": _super_rename("ChangeLane", "ChangeLane"),
+        "scenario_name": "ChangeLane",
+        "xml_type": "ChangeLane",
+        "source": "change_lane.py",
+        "xml_source": "ChangeLane.xml",
+        "code_name": "change_lane_{n}.py",
+        "xml_name": "ChangeLane_{n}.xml",
+        "parameters": {
+            "self._fast_vehicle_velocity": integer(1, 32),
+            "self._slow_vehicle_distance": integer(25, 160),
+            "self._fast_vehicle_distance": choice(5, 25, 45, 65, 85),
+            "self._trigger_distance": choice(10, 20, 30, 40),
+            "weather": WEATHER,
+            "desired_speed": DESIRED_SPEED,
+        },
+        "results": {
+            "type": "ChangeLane",
+            "fields": {
+                "self._fast_vehicle_velocity": "Fast Vehicle Velocity",
+                "self._slow_vehicle_distance": "Distance to Obstacle",
+                "self._fast_vehicle_distance": "Fast Vehicle Distance",
+                "self._trigger_distance": "Trigger Distance",
+                "weather": "Weather",
+            },
+        },
+        # The fast vehicle starts at least 20 m behind the slow one
+        "constraints": [at_most("self._fast_vehicle_distance", "self._slow_vehicle_distance", -20)],
+    },
+    "cut_in_with_static_vehicle": {
+        "class_name": "StaticCutIn",
+        "super": _super_rename("StaticCutIn", "StaticCutIn"),
+        "scenario_name": "StaticCutIn",
+        "xml_type": "StaticCutIn",
+        "source": "cut_in_with_static_vehicle.py",
+        "xml_source": "CutIn.xml",
+        "code_name": "cut_in_with_static_vehicle_{n}.py",
+        "xml_name": "CutIn_{n}.xml",
+        "parameters": {
+            "self._back_vehicles": integer(1, 35),
+            "weather": WEATHER,
+            "desired_speed": DESIRED_SPEED,
+        },
+        "results": {
+            "type": "StaticCutIn",
+            "fields": {
+                "self._back_vehicles": "No of Back Vehicles",
+                "weather": "Weather",
+            },
+        },
+    },
+    "dynamic_object_crossing": {
+        "class_name": "DynamicObjectCrossing",
+        "super": _super_rename("DynamicObjectCrossing", "DynamicObjectCrossing"),
+        "scenario_name": "DynamicObjectCrossing",
+        "xml_type": "DynamicObjectCrossing",
+        "source": "object_crash_vehicle.py",
+        "xml_source": "ObjectCrossing.xml",
+        "code_name": "object_crash_vehicle_{n}.py",
+        "xml_name": "ObjectCrossing_{n}.xml",
+        "parameters": {
+            "self._adversary_distance": integer(10, 80),
+            "weather": WEATHER,
+            "desired_speed": DESIRED_SPEED,
+        },
+        "results": {
+            "type": "DynamicObjectCrossing",
+            "fields": {
+                "self._adversary_distance": "Adversary Distance",
+                "weather": "Weather",
+            },
+        },
+    },
+    "follow_leading_vehicle": {
+        "class_name": "FollowLeadingVehicle",
+        "super": _super_rename("FollowLeadingVehicle", "FollowVehicle"),
+        "scenario_name": "FollowLeadingVehicle",
+        "xml_type": "FollowLeadingVehicle",
+        "source": "follow_leading_vehicle.py",
+        "xml_source": "FollowLeadingVehicle.xml",
+        "code_name": "follow_leading_vehicle_{n}.py",
+        "xml_name": "FollowLeadingVehicle_{n}.xml",
+        "parameters": {
+            "self._back_vehicles": integer(1, 35),
+            "self._first_vehicle_location": integer(10, 200),
+            "self._first_vehicle_speed": integer(1, 20),
+            "weather": WEATHER,
+            "desired_speed": DESIRED_SPEED,
+        },
+        "results": {
+            "type": "FollowLeadingVehicle",
+            "fields": {
+                "self._first_vehicle_location": "Leading Vehicle Location",
+                "self._first_vehicle_speed": "Leading Vehicle Speed",
+                "weather": "Weather",
+            },
+        },
+    },
+    "follow_leading_vehicle_with_obstacle": {
+        "class_name": "FollowLeadingVehicleWithObstacle",
+        "super": _super_rename("FollowLeadingVehicleWithObstacle", "FollowLeadingVehicleWithObstacle"),
+        "scenario_name": "FollowLeadingVehicleWithObstacle",
+        "xml_type": "FollowLeadingVehicleWithObstacle",
+        "source": "follow_leading_vehicle _with_obstacle.py",
+        "xml_source": "FollowLeadingVehicle.xml",
+        "code_name": "follow_leading_vehicle_with_obstacle_{n}.py",
+        "xml_name": "FollowLeadingVehicleWithObstacle_{n}.xml",
+        "parameters": {
+            "self._first_actor_location": integer(10, 200),
+            "self._second_actor_location": integer(10, 120),
+            "self._first_actor_speed": integer(1, 20),
+            "weather": WEATHER,
+            "desired_speed": DESIRED_SPEED,
+        },
+        "results": {
+            "type": "FollowLeadingVehicleWithObstacle",
+            "fields": {
+                "self._first_actor_location": "First Actor Location",
+                "self._second_actor_location": "Second Actor Location",
+                "self._first_actor_speed": "First Actor Speed",
+                "weather": "Weather",
+            },
+        },
+    },
+    "hazard_at_side_lane": {
+        "class_name": "HazardAtSideLane",
+        "super": _bare_super_rename("HazardAtSideLane"),
+        "scenario_name": "HazardAtSideLane",
+        "xml_type": "HazardAtSideLane",
+        "source": "route_obstacles.py",
+        "xml_source": "RouteObstacles.xml",
+        "code_name": "route_obstacles_{n}.py",
+        "xml_name": "RouteObstacles_{n}.xml",
+        "parameters": {
+            "self._adversary_distance": integer(30, 100),
+            "weather": WEATHER,
+            "desired_speed": DESIRED_SPEED,
+        },
+        "results": {
+            "type": "HazardAtSideLane",
+            "fields": {
+                "weather": "Weather",
+            },
+        },
+    },
+    "no_signal_junction_crossing": {
+        "class_name": "NoSignalJunctionCrossing",
+        "super": _super_rename("NoSignalJunctionCrossing", "NoSignalJunctionCrossing"),
+        "scenario_name": "NoSignalJunctionCrossing",
+        "xml_type": "NoSignalJunctionCrossing",
+        "source": "no_signal_junction_crossing.py",
+        "xml_source": "NoSignalJunction.xml",
+        "code_name": "no_signal_junction_crossing_{n}.py",
+        "xml_name": "NoSignalJunction_{n}.xml",
+        "parameters": {
+            "_other_actor_target_velocity": integer(5, 25),
+            "self.throttle": uniform(0.5, 1.0),
+            "weather": WEATHER,
+        },
+        "results": {
+            "type": "NoSignalJunctionCrossing",
+            "fields": {
+                "_other_actor_target_velocity": "Other Vehicle Target Velocity",
+                "weather": "Weather",
+            },
+        },
+    },
+    "opposite_vehicle_running_red_light": {
+        "class_name": "OppositeVehicleRunningRedLight",
+        "super": _bare_super_rename("OppositeVehicleJunction"),
+        "scenario_name": "OppositeVehicleRunningRedLight",
+        "xml_type": "OppositeVehicleRunningRedLight",
+        "source": "opposite_vehicle_taking_priority.py",
+        "xml_source": "RunningRedLight.xml",
+        "code_name": "opposite_vehicle_taking_priority_{n}.py",
+        "xml_name": "RunningRedLight_{n}.xml",
+        "parameters": {
+            "self._adversary_orignal_speed": integer(15, 30),
+            "self.throttle": uniform(0.5, 1.0),
+            "weather": WEATHER,
+        },
+        "results": {
+            "type": "OppositeVehicleRunningRedLight",
+            "fields": {
+                "weather": "Weather",
+            },
+        },
+    },
+    "other_leading_vehicle": {
+        "class_name": "OtherLeadingVehicle",
+        "super": _super_rename("OtherLeadingVehicle", "VehicleDeceleratingInMultiLaneSetUp"),
+        "scenario_name": "OtherLeadingVehicle",
+        "xml_type": "OtherLeadingVehicle",
+        "source": "other_leading_vehicle.py",
+        "xml_source": "LeadingVehicle.xml",
+        "code_name": "other_leading_vehicle_{n}.py",
+        "xml_name": "LeadingVehicle_{n}.xml",
+        "parameters": {
+            "self._first_vehicle_location": integer(10, 100),
+            "self._first_vehicle_original_speed": integer(10, 60),
+            "weather": WEATHER,
+            "desired_speed": DESIRED_SPEED,
+        },
+        "results": {
+            "type": "OtherLeadingVehicle",
+            "fields": {
+                "self._first_vehicle_location": "First Vehicle Location",
+                # Set in km/h, logged in m/s
+                "self._first_vehicle_original_speed": ("First Vehicle Speed", 3.6),
+                "weather": "Weather",
+            },
+        },
+    },
+    "parked_obstacle": {
+        "class_name": "ParkedObstacle",
+        "super": _bare_super_rename("ParkedObstacle"),
+        "scenario_name": "ParkedObstacle",
+        "xml_type": "ParkedObstacle",
+        "source": "route_obstacles.py",
+        "xml_source": "RouteObstacles.xml",
+        "code_name": "parked_obstacle_{n}.py",
+        "xml_name": "ParkedObstacle_{n}.xml",
+        "parameters": {
+            "self._adversary_distance": integer(30, 120),
+            "weather": WEATHER,
+            "desired_speed": DESIRED_SPEED,
+        },
+        "results": {
+            "type": "ParkedObstacle",
+            "fields": {
+                "self._adversary_distance": "Adversary Distance",
+                "weather": "Weather",
+            },
+        },
+    },
+    "parking_crossing_pedestrian": {
+        "class_name": "ParkingCrossingPedestrian",
+        "super": _bare_super_rename("ParkingCrossingPedestrian"),
+        "scenario_name": "ParkingCrossingPedestrian",
+        "xml_type": "ParkingCrossingPedestrian",
+        "source": "object_crash_vehicle.py",
+        "xml_source": "ObjectCrossing.xml",
+        "code_name": "parking_crossing_pedestrian_{n}.py",
+        "xml_name": "ParkingCrossingPedestrian_{n}.xml",
+        "parameters": {
+            "self._adversary_distance": integer(30, 180),
+            "weather": WEATHER,
+            "desired_speed": DESIRED_SPEED,
+        },
+        "results": {
+            "type": "ParkingCrossingPedestrian",
+            "fields": {
+                "self._adversary_distance": "Adversary Distance",
+                "weather": "Weather",
+            },
+        },
+    },
+    "vehicle_opens_door": {
+        "class_name": "VehicleOpensDoorTwoWays",
+        "super": _bare_super_rename("VehicleOpensDoorTwoWays"),
+        "scenario_name": "VehicleOpensDoor",
+        "xml_type": "VehicleOpensDoorTwoWays",
+        "source": "vehicle_opens_door.py",
+        "xml_source": "VehicleOpensDoor.xml",
+        "code_name": "vehicle_opens_door_{n}.py",
+        "xml_name": "VehicleOpensDoor_{n}.xml",
+        "parameters": {
+            "self._adversary_distance": integer(10, 100),
+            "self.throttle": uniform(0.4, 1.0),
+            "weather": WEATHER,
+        },
+        "results": {
+            "type": "VehicleOpensDoor",
+            "fields": {
+                "self._adversary_distance": "Adversary Distance",
+                "weather": "Weather",
+            },
+        },
+    },
+    "vehicle_turning_right": {
+        "class_name": "VehicleTurningRight",
+        # Renames both the class and the scenario name inside the super() call
+        "super": (r'super\(VehicleTurningRight, self\)\.__init__\((.*?)VehicleTurningRight(.*?)\)',
+                  r'super(VehicleTurningRight_{n}, self).__init__(\g<1>VehicleTurningRight_{n}\2)'),
+        "scenario_name": "VehicleTurningRight",
+        "xml_type": "VehicleTurningRight",
+        "source": "object_crash_intersection.py",
+        "xml_source": "VehicleTurning.xml",
+        "code_name": "object_crash_intersection_{n}.py",
+        "xml_name": "VehicleTurning_{n}.xml",
+        "parameters": {
+            "weather": WEATHER,
+            "desired_speed": DESIRED_SPEED,
+        },
+        "results": {
+            "type": "VehicleTurningRight",
+            "fields": {
+                "weather": "Weather",
+            },
+        },
+    },
+}
@@ -0,0 +1,148 @@
+"""Rank generated variations by how likely they are to end in a critical collision.
+
+A k-nearest-neighbour surrogate is fitted per scenario type on the simulated
+records in Scenario Results, using the parameters both sides know (see
+"results" in scenario_specs.py): numeric parameters scaled to unit variance,
+weather one-hot encoded. For every variation it predicts the collision
+probability and the expected intensity (0 when there is no collision) as the
+mean over its neighbours, and variations are ranked by expected intensity so
+the simulator runs the most critical ones first.
+
+    python scenario_surrogate.py "Scenario Dataset/scenarios" --output ranking.json
+"""
+import argparse
+import glob
+import json
+import os
+import re
+
+import numpy as np
+
+from scenario_index import DEFAULT_ARCHIVE, archive_records, canonical, logged_values, read_variation, result_fields
+from scenario_specs import SCENARIO_TYPES
+
+NEIGHBOURS = 15
+# Query rows compared against the training set at a time
+CHUNK_SIZE = 4096
+
+
+class Surrogate:
+    """k-NN model of one scenario type's collision outcome and intensity."""
+
+    def __init__(self, type_name, records, neighbours=NEIGHBOURS):
+        fields = result_fields(SCENARIO_TYPES[type_name])
+        self.type_name = type_name
+        self.names = [name for name in SCENARIO_TYPES[type_name]["parameters"] if name in fields]
+        records = [record for record in records if logged_values(record, fields) is not None]
+        if not records:
+            raise ValueError(f"No simulated {type_name} records to fit")
+        self.neighbours = min(neighbours, len(records))
+
+        logged = [logged_values(record, fields) for record in records]
+        columns = {name: [canonical(values[name]) for values in logged] for name in self.names}
+        self.categories = {name: sorted(set(values)) for name, values in columns.items()
+                           if any(isinstance(value, str) for value in values)}
+        numeric = [name for name in self.names if name not in self.categories]
+        raw = np.array([columns[name] for name in numeric], dtype=float).T.reshape(len(records), len(numeric))
+        self.mean = raw.mean(axis=0)
+        self.scale = np.where(raw.std(axis=0) > 0, raw.std(axis=0), 1.0)
+        self.features = self.encode(columns)
+
+        self.collision = np.array([bool(record.get("Collision")) for record in records], dtype=float)
+        self.intensity = np.array([float(record.get("Intensity", 0.0)) if record.get("Collision") else 0.0
+                                   for record in records])
+
+    def encode(self, columns):
+        """Feature matrix for {name: list of canonical values} (numeric scaled, categories one-hot)."""
+        numeric = [name for name in self.names if name not in self.categories]
+        n = len(columns[self.names[0]]) if self.names else 0
+        raw = np.array([columns[name] for name in numeric], dtype=float).T.reshape(n, len(numeric))
+        parts = [(raw - self.mean) / self.scale]
+        for name, categories in self.categories.items():
+            # Unseen categories encode as all zeros, equally far from every known one
+            parts.append(np.array([[value == category for category in categories] for value in columns[name]],
+                                  dtype=float).reshape(n, len(categories)))
+        return np.hstack(parts)
+
+    def _neighbour_indices(self, features, exclude_self=False):
+        k = self.neighbours - 1 if exclude_self else self.neighbours
+        indices = []
+        for start in range(0, len(features), CHUNK_SIZE):
+            chunk = features[start:start + CHUNK_SIZE]
+            distances = ((chunk[:, None, :] - self.features[None, :, :]) ** 2).sum(axis=2)
+            if exclude_self:
+                distances[np.arange(len(chunk)), start + np.arange(len(chunk))] = np.inf
+            indices.append(np.argpartition(distances, k - 1, axis=1)[:, :k])
+        return np.vstack(indices) if indices else np.empty((0, k), dtype=np.intp)
+
+    def predict(self, rows):
+        """(collision probability, expected intensity) arrays for dicts of parameter values."""
+        columns = {name: [canonical(row[name]) for row in rows] for name in self.names}
+        nearest = self._neighbour_indices(self.encode(columns))
+        return self.collision[nearest].mean(axis=1), self.intensity[nearest].mean(axis=1)
+
+    def leave_one_out_accuracy(self):
+        """Share of training records whose collision outcome the other records predict correctly."""
+        if self.neighbours < 2:
+            return float("nan")
+        nearest = self._neighbour_indices(self.features, exclude_self=True)
+        return float(((self.collision[nearest].mean(axis=1) >= 0.5) == self.collision).mean())
+
+
+def read_variations(type_name, directory):
+    """[(file path, variation number, parameter values)] for a type's generated files in a folder."""
+    spec = SCENARIO_TYPES[type_name]
+    class_pattern = re.compile(rf"class\s+{spec['class_name']}_(\d+)\s*\(")
+    variations = []
+    for file_path in glob.glob(os.path.join(directory, spec["code_name"].replace("{n}", "*"))):
+        with open(file_path, "r") as file:
+            code = file.read()
+        match = class_pattern.search(code)
+        values = read_variation(code, spec) if match else None
+        if values is not None:
+            variations.append((file_path, int(match.group(1)), values))
+    return variations
+
+
+def rank_type(type_name, directory, records, neighbours=NEIGHBOURS):
+    """Ranking entries for one type's variations, most critical first."""
+    variations = read_variations(type_name, directory)
+    if not variations:
+        return []
+    model = Surrogate(type_name, records, neighbours)
+    print(f"{type_name}: fitted on {len(model.collision)} results using {', '.join(model.names)}; "
+          f"leave-one-out collision accuracy {model.leave_one_out_accuracy():.1%} "
+          f"(base rate {model.collision.mean():.1%})")
+    probability, intensity = model.predict([values for _, _, values in variations])
+    class_name = SCENARIO_TYPES[type_name]["class_name"]
+    entries = [{"type": type_name, "scenario": f"{class_name}_{n}", "file": file_path,
+                "collision_probability": round(float(p), 4), "expected_intensity": round(float(i), 2)}
+               for (file_path, n, _), p, i in zip(variations, probability, intensity)]
+    entries.sort(key=lambda entry: (-entry["expected_intensity"], -entry["collision_probability"]))
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("scenarios", help="folder of generated scenario files")
+    parser.add_argument("--types", nargs="+", default=list(SCENARIO_TYPES), choices=list(SCENARIO_TYPES))
+    parser.add_argument("--archive", default=DEFAULT_ARCHIVE, help="Scenario Results zip archive")
+    parser.add_argument("--neighbours", type=int, default=NEIGHBOURS)
+    parser.add_argument("--output", default="./ranking.json")
+    args = parser.parse_args()
+
+    records = archive_records(args.archive, args.types)
+    ranking = []
+    for type_name in args.types:
+        ranking.extend(rank_type(type_name, args.scenarios,
+                                 records.get(SCENARIO_TYPES[type_name]["results"]["type"], []), args.neighbours))
+    # Intensity is the same physical measure for every type (the NSGA objectives compare it across types too)
+    ranking.sort(key=lambda entry: (-entry["expected_intensity"], -entry["collision_probability"]))
+
+    with open(args.output, 'w') as file:
+        json.dump(ranking, file, indent=4)
+    print(f"{len(ranking)} variations ranked, saved to:", args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Scenario sources compiled once into templates with named fields.
+
+The generation scripts run their usual re.sub passes a single time with
+field(name) markers in place of the sampled values; ScenarioTemplate then
+splits the result into literal text and fields, so every variation renders
+with one str.format call instead of rescanning the source with regexes.
+"""
+import re
+
+_MARK = "\x00"
+
+
+def field(name):
+    """Marker for a value filled in at render time; use it in re.sub replacements."""
+    return f"{_MARK}{name}{_MARK}"
+
+
+class ScenarioTemplate:
+    """Literal text interleaved with named fields, rendered with a single str.format call."""
+
+    def __init__(self, marked_text):
+        parts = marked_text.split(_MARK)
+        if len(parts) % 2 == 0:
+            raise ValueError("Unbalanced field marker in scenario template")
+        literals = [part.replace("{", "{{").replace("}", "}}") for part in parts[0::2]]
+        self.fields = list(dict.fromkeys(parts[1::2]))
+        positions = {name: i for i, name in enumerate(self.fields)}
+        self._format = (literals[0] + "".join(
+            f"{{{positions[name]}}}{literal}" for name, literal in zip(parts[1::2], literals[1:])
+        )).format
+
+    def render(self, values):
+        return self._format(*[values[name] for name in self.fields])
+
+
+def compile_scenario(original_code, original_xml, variable_ranges, renames, scenario_name, xml_type):
+    """Apply a script's substitution passes once, in their original order, and return (code, xml) templates.
+
+    renames holds (pattern, replacement, count) for the class and super() renames, which the
+    scripts applied after every variable. Fields: "n" (variation number), "weather_part" and
+    one per variable in variable_ranges.
+    """
+    code = original_code
+    for variable, value_spec in variable_ranges.items():
+        if value_spec is not None:
+            if variable == "weather":
+                code = re.sub(r"self\.output\['Weather'\]\s*=\s*\".*\"",
+                              f"self.output['Weather'] = \"{field('weather_part')}\"", code)
+            for pattern, replacement, count in renames:
+                code = re.sub(pattern, replacement, code, count=count)
+            code = re.sub(rf"\b{re.escape(variable)}\b\s*=\s*[^,\n]*", f"{variable} = {field(variable)}", code)
+
+    code = re.sub(rf"self\.output\['Scenario Name'\]\s*=\s*\"{scenario_name}\"",
+                  f"self.output['Scenario Name'] = \"{scenario_name}_{field('n')}\"", code)
+    xml = original_xml.replace(f'type="{xml_type}"', f'type="{xml_type}_{field("n")}"')
+    return ScenarioTemplate(code), ScenarioTemplate(xml)
@@ -0,0 +1,303 @@
+"""Run generated scenario variations through a simulator on a pool of workers.
+
+Jobs come from a ranking (scenario_surrogate.py), in ranked order, or from a
+folder of generated files. Each job is run by a backend under a timeout and
+retried up to --attempts times, and its outcome is appended to a journal as
+soon as it finishes. Re-running with the same journal skips finished jobs,
+so an interrupted run resumes where it stopped. Jobs are keyed by file and a
+hash of their parameters, so a variation that reuses a finished one's name
+(e.g. from another batch) still runs. Results are written per type
+in the Scenario Results record schema, and collisions also as a scenario pool
+for the NSGA, Random Search and ASIL scripts.
+
+The stand-in backend derives a deterministic outcome from the variation's
+parameters, so the pipeline can be built and load-tested without CARLA; the
+command backend runs one scenario_runner invocation per job and reads the
+record it writes to {output}.
+
+    python simulation_scheduler.py --ranking ranking.json --journal run.jsonl --output results --workers 8
+    python simulation_scheduler.py --scenarios generated/scenarios --journal run.jsonl --output results \\
+        --backend command --command "python scenario_runner.py --scenario {scenario} --output-file {output}"
+"""
+import argparse
+import hashlib
+import json
+import os
+import shlex
+import subprocess
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+
+from scenario_index import canonical, read_variation, result_fields
+from scenario_specs import SCENARIO_TYPES
+from scenario_surrogate import read_variations
+from variation_writer import Progress
+
+WORKERS = 4
+ATTEMPTS = 3
+TIMEOUT = 600.0
+
+# Actor hit in the stand-in collisions, the one most often logged for the type in Scenario Results
+STAND_IN_ACTORS = {
+    "ChangeLane": "vehicle.lincoln.mkz_2017",
+    "DynamicObjectCrossing": "walker.pedestrian.0040",
+    "FollowLeadingVehicle": "vehicle.tesla.model3",
+    "FollowLeadingVehicleWithObstacle": "vehicle.diamondback.century",
+    "HazardAtSideLane": "vehicle.diamondback.century",
+    "NoSignalJunctionCrossing": "vehicle.tesla.model3",
+    "OppositeVehicleRunningRedLight": "vehicle.dodge.charger_police_2020",
+    "OtherLeadingVehicle": "vehicle.nissan.patrol",
+    "ParkedObstacle": "vehicle.ford.crown",
+    "ParkingCrossingPedestrian": "walker.pedestrian.0036",
+    "StaticCutIn": "vehicle.ford.mustang",
+    "VehicleOpensDoor": "vehicle.dodge.charger_police_2020",
+    "VehicleTurningRight": "vehicle.diamondback.century",
+}
+
+
+class SimulationError(Exception):
+    pass
+
+
+class SimulationTimeout(SimulationError):
+    pass
+
+
+def _stable_seed(*parts):
+    return int.from_bytes(hashlib.blake2b(repr(parts).encode(), digest_size=8).digest(), "little")
+
+
+class StandInSimulator:
+    """Deterministic replacement for CARLA: the outcome depends only on the variation's parameters.
+
+    delay is the mean simulated run time in seconds; failure_rate and hang_rate inject crashes and
+    runs that never finish (they hit the timeout), decided per attempt so that retries can succeed.
+    """
+
+    def __init__(self, delay=0.0, failure_rate=0.0, hang_rate=0.0, collision_rate=0.75):
+        self.delay = delay
+        self.failure_rate = failure_rate
+        self.hang_rate = hang_rate
+        self.collision_rate = collision_rate
+
+    def run(self, job, attempt, timeout):
+        spec = SCENARIO_TYPES[job["type"]]
+        with open(job["file"], "r") as file:
+            values = read_variation(file.read(), spec)
+        if values is None:
+            raise SimulationError(f"{job['file']} does not assign every {job['type']} parameter")
+
+        trial = np.random.default_rng(_stable_seed(job["scenario"], attempt))
+        duration = np.inf if trial.random() < self.hang_rate else self.delay * trial.uniform(0.5, 1.5)
+        if duration > timeout:
+            time.sleep(timeout)
+            raise SimulationTimeout(f"{job['scenario']} did not finish within {timeout}s")
+        time.sleep(duration)
+        if trial.random() < self.failure_rate:
+            raise SimulationError(f"{job['scenario']} crashed (stand-in failure)")
+
+        results = spec["results"]
+        outcome = np.random.default_rng(_stable_seed(job["type"], *(canonical(v) for v in values.values())))
+        record = {"Scenario Name": job["scenario"],
+                  "Scenario Description": f"Stand-in simulation of {results['type']}",
+                  "Map": "Map(name=stand-in)"}
+        record.update({field: canonical(values[name] if scale == 1 else values[name] / scale)
+                       for name, (field, scale) in result_fields(spec).items()})
+        record["Collision"] = bool(outcome.random() < self.collision_rate)
+        if record["Collision"]:
+            speed = outcome.uniform(1.0, 35.0)
+            record.update({
+                "Collision Type": f"Actor(id={outcome.integers(100, 300)}, type={STAND_IN_ACTORS[results['type']]})",
+                "Time to Collision": outcome.uniform(2.0, 20.0),
+                "Speed at Collision": speed,
+                "Intensity": speed * outcome.uniform(200.0, 2500.0),
+            })
+        return record
+
+
+class CommandSimulator:
+    """Runs a command per job ({scenario}, {file} and {output} are filled in) and reads the JSON
+    record it writes to {output}; a list of records counts as its last record."""
+
+    def __init__(self, command, working_dir=None):
+        self.command = command
+        self.working_dir = working_dir
+
+    def run(self, job, attempt, timeout):
+        handle, output_path = tempfile.mkstemp(suffix=".json")
+        os.close(handle)
+        try:
+            arguments = [part.format(scenario=job["scenario"], file=job["file"], output=output_path)
+                         for part in shlex.split(self.command, posix=os.name != "nt")]
+            try:
+                completed = subprocess.run(arguments, cwd=self.working_dir, capture_output=True, text=True,
+                                           timeout=timeout)
+            except subprocess.TimeoutExpired:
+                raise SimulationTimeout(f"{job['scenario']} did not finish within {timeout}s") from None
+            if completed.returncode != 0:
+                raise SimulationError(f"{job['scenario']} exited with {completed.returncode}: "
+                                      f"{completed.stderr.strip()[-500:]}")
+            try:
+                with open(output_path, "r") as file:
+                    record = json.load(file)
+            except ValueError as e:
+                raise SimulationError(f"{job['scenario']} wrote no readable record: {e}") from None
+            return record[-1] if isinstance(record, list) else record
+        finally:
+            os.remove(output_path)
+
+
+def run_job(backend, job, attempts, timeout):
+    """Journal entry for a job, after up to `attempts` tries."""
+    errors = []
+    for attempt in range(1, attempts + 1):
+        try:
+            record = backend.run(job, attempt, timeout)
+        except SimulationError as e:
+            errors.append(str(e))
+            continue
+        return {**job, "status": "done", "attempts": attempt, "record": record}
+    return {**job, "status": "failed", "attempts": attempts, "errors": errors}
+
+
+def job_key(job, values=None):
+    """Journal key of a job: its file and a hash of the parameter values in it (read from the file
+    unless given)."""
+    spec = SCENARIO_TYPES[job["type"]]
+    if values is None:
+        with open(job["file"], "r") as file:
+            values = read_variation(file.read(), spec)
+    parameters = None if values is None else tuple(canonical(values[name]) for name in spec["parameters"])
+    return f"{os.path.normpath(job['file'])}#{_stable_seed(job['type'], parameters):016x}"
+
+
+def read_journal(journal_path):
+    """{job key: latest journal entry}; a line cut off by a crash is ignored."""
+    entries = {}
+    if os.path.exists(journal_path):
+        with open(journal_path, "r") as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                entries[entry.get("key", entry["scenario"])] = entry
+    return entries
+
+
+def run_jobs(jobs, backend, journal_path, workers=WORKERS, attempts=ATTEMPTS, timeout=TIMEOUT, progress=None):
+    """Run jobs on `workers` threads, appending each finished entry to the journal. Returns
+    (done, failed) counts for this run."""
+    progress = progress or Progress("Scenarios simulated")
+    jobs = iter(jobs)
+    done = failed = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor, open(journal_path, "a") as journal:
+        pending = set()
+        while True:
+            # Keep a few jobs queued per worker, but never the whole batch
+            for job in jobs:
+                pending.add(executor.submit(run_job, backend, job, attempts, timeout))
+                if len(pending) >= 2 * workers:
+                    break
+            if not pending:
+                break
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                entry = future.result()
+                journal.write(json.dumps(entry) + "\n")
+                journal.flush()
+                if entry["status"] == "done":
+                    done += 1
+                else:
+                    failed += 1
+                    print(f"{entry['scenario']} failed after {entry['attempts']} attempts: {entry['errors'][-1]}")
+                progress.update()
+    progress.close()
+    return done, failed
+
+
+def write_results(entries, output_dir, pool_output=None):
+    """Write finished records to <output_dir>/<results type>/<results type>.json, and collisions to pool_output."""
+    by_type = {}
+    for entry in entries:
+        if entry["status"] == "done":
+            by_type.setdefault(SCENARIO_TYPES[entry["type"]]["results"]["type"], []).append(entry["record"])
+    for result_type, records in by_type.items():
+        os.makedirs(os.path.join(output_dir, result_type), exist_ok=True)
+        with open(os.path.join(output_dir, result_type, f"{result_type}.json"), 'w') as file:
+            json.dump(records, file, indent=4)
+    if pool_output:
+        collisions = [record for records in by_type.values() for record in records if record.get("Collision")]
+        with open(pool_output, 'w') as file:
+            json.dump(collisions, file, indent=4)
+        print(f"{len(collisions)} collision scenarios saved to:", pool_output)
+    return by_type
+
+
+def folder_jobs(directory, types):
+    jobs = []
+    for type_name in types:
+        class_name = SCENARIO_TYPES[type_name]["class_name"]
+        variations = sorted(read_variations(type_name, directory), key=lambda variation: variation[1])
+        for file_path, n, values in variations:
+            job = {"type": type_name, "scenario": f"{class_name}_{n}", "file": file_path}
+            jobs.append(dict(job, key=job_key(job, values)))
+    return jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--ranking", help="ranking written by scenario_surrogate.py (run in ranked order)")
+    source.add_argument("--scenarios", help="folder of generated scenario files")
+    parser.add_argument("--types", nargs="+", default=list(SCENARIO_TYPES), choices=list(SCENARIO_TYPES))
+    parser.add_argument("--limit", type=int, default=None, help="run at most this many jobs")
+    parser.add_argument("--journal", required=True, help="JSON-lines journal; an existing one is resumed")
+    parser.add_argument("--retry-failed", action="store_true", help="also rerun jobs the journal records as failed")
+    parser.add_argument("--output", default="./simulation results", help="folder for per-type result files")
+    parser.add_argument("--pool-output", default=None, help="optionally write the collision records as a pool")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="simulations run at once")
+    parser.add_argument("--attempts", type=int, default=ATTEMPTS)
+    parser.add_argument("--timeout", type=float, default=TIMEOUT, help="seconds per attempt")
+    parser.add_argument("--backend", choices=("stand-in", "command"), default="stand-in")
+    parser.add_argument("--command", default=None, help="command backend: command line run per job")
+    parser.add_argument("--working-dir", default=None, help="command backend: directory the command runs in")
+    parser.add_argument("--stand-in-delay", type=float, default=0.0, help="stand-in backend: mean seconds per run")
+    parser.add_argument("--stand-in-failure-rate", type=float, default=0.0)
+    parser.add_argument("--stand-in-hang-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    if args.backend == "command":
+        if not args.command:
+            parser.error("--backend command needs --command")
+        backend = CommandSimulator(args.command, args.working_dir)
+    else:
+        backend = StandInSimulator(args.stand_in_delay, args.stand_in_failure_rate, args.stand_in_hang_rate)
+
+    if args.ranking:
+        with open(args.ranking, 'r') as file:
+            jobs = [entry for entry in json.load(file) if entry["type"] in args.types][:args.limit]
+        jobs = [dict(job, key=job_key(job)) for job in jobs]
+    else:
+        jobs = folder_jobs(args.scenarios, args.types)[:args.limit]
+
+    finished = read_journal(args.journal)
+    skip = {"done", "failed"} if not args.retry_failed else {"done"}
+    remaining = [job for job in jobs if finished.get(job["key"], {}).get("status") not in skip]
+    print(f"{len(jobs) - len(remaining)} of {len(jobs)} jobs already in the journal, running {len(remaining)}")
+
+    start = time.perf_counter()
+    done, failed = run_jobs(remaining, backend, args.journal, args.workers, args.attempts, args.timeout)
+    elapsed = time.perf_counter() - start
+    print(f"{done} simulated, {failed} failed in {elapsed:.1f}s"
+          + (f" ({done / elapsed:.1f} scenarios/s)" if done and elapsed > 0 else ""))
+
+    by_type = write_results(read_journal(args.journal).values(), args.output, args.pool_output)
+    print(f"{sum(len(records) for records in by_type.values())} results saved to:", args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""Checks that archived results block regeneration of the tuples they log.
+
+    python -m pytest "Scenario Generation Scripts/test_scenario_index.py"
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from scenario_index import ParameterIndex, add_results, canonical  # noqa: E402
+
+
+def test_canonical_rounds_before_the_integer_test():
+    assert canonical(25 / 3 * 3.6) == 30 and isinstance(canonical(25 / 3 * 3.6), int)
+    assert canonical(8.333333333333334 * 3.6) == 30
+    assert canonical(10.833333333333334 * 3.6) == 39
+    assert canonical(2.5) == 2.5
+
+
+def test_scaled_archive_result_blocks_the_same_tuple(tmp_path):
+    # Logged in m/s: 30 km/h is 8.333... m/s, and 8.333... * 3.6 == 30.000000000000004
+    record = {"First Vehicle Location": 14, "First Vehicle Speed": 30 / 3.6, "Weather": "ClearNight"}
+    index = ParameterIndex(str(tmp_path), "other_leading_vehicle")
+    assert add_results(index, [record]) == 1
+    generated = {
+        "self._first_vehicle_location": 14,
+        "self._first_vehicle_original_speed": 30,
+        "weather": "carla.WeatherParameters.ClearNight",
+        "desired_speed": 50,
+    }
+    assert not index.add(generated)
+    assert index.add(dict(generated, **{"self._first_vehicle_original_speed": 31}))
+
+    # The projection survives a save and reload
+    index.save()
+    assert not ParameterIndex(str(tmp_path), "other_leading_vehicle").add(generated)
@@ -0,0 +1,80 @@
+"""Stream generated scenario variations to disk through a bounded pool of writer threads.
+
+Variations are consumed from a generator as they are produced, and at most
+max_pending of them are held in memory while the threads write them out, so
+memory stays flat no matter how many variations are generated.
+"""
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_SCENARIO_RUNNER = r"E:\Games\Carla\scenario_runner-0.9.15"
+WORKERS = 8
+
+
+class Progress:
+    """Counter printed at most once per `interval` seconds instead of once per item."""
+
+    def __init__(self, label, interval=1.0):
+        self.label = label
+        self.interval = interval
+        self.count = 0
+        self._last = time.monotonic()
+
+    def update(self, n=1):
+        self.count += n
+        now = time.monotonic()
+        if now - self._last >= self.interval:
+            self._last = now
+            print(f"{self.label}: {self.count}", flush=True)
+
+    def close(self):
+        print(f"{self.label}: {self.count}", flush=True)
+
+
+def _write_variation(code_path, code, xml_path, xml):
+    with open(code_path, "w") as code_file:
+        code_file.write(code)
+    with open(xml_path, "w") as xml_file:
+        xml_file.write(xml)
+
+
+def write_variations(variations, output_dir, code_name, xml_name, workers=WORKERS, max_pending=None, progress=None):
+    """Write (n, code, xml) tuples to <output_dir>/scenarios/<code_name> and <output_dir>/examples/<xml_name>,
+    with {n} in the names replaced by the variation number.
+
+    Returns the number of variations written; a failed write is raised here.
+    """
+    max_pending = max_pending or 4 * workers
+    progress = progress or Progress("Variations written")
+    code_dir = os.path.join(output_dir, "scenarios")
+    xml_dir = os.path.join(output_dir, "examples")
+    os.makedirs(code_dir, exist_ok=True)
+    os.makedirs(xml_dir, exist_ok=True)
+
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for n, code, xml in variations:
+            if len(pending) >= max_pending:
+                pending.popleft().result()
+                progress.update()
+            pending.append(executor.submit(_write_variation, os.path.join(code_dir, code_name.format(n=n)), code,
+                                           os.path.join(xml_dir, xml_name.format(n=n)), xml))
+        while pending:
+            pending.popleft().result()
+            progress.update()
+    progress.close()
+    return progress.count
+
+
+def add_output_arguments(parser, num_variations=1000):
+    """Command-line options shared by the generation scripts."""
+    parser.add_argument("--scenario-runner", default=DEFAULT_SCENARIO_RUNNER,
+                        help="scenario_runner checkout holding the original scenario files")
+    parser.add_argument("--output-dir", default=None,
+                        help="variations go to <output-dir>/scenarios and <output-dir>/examples "
+                             "(default: <scenario-runner>/srunner)")
+    parser.add_argument("--num-variations", type=int, default=num_variations)
+    parser.add_argument("--workers", type=int, default=WORKERS, help="file writer threads")
+    return parser
@@ -0,0 +1,95 @@
+"""Build the scenario pool straight from Scenario Results.zip without extracting it.
+
+Members are inflated and decoded concurrently (zlib releases the GIL) and
+streamed back in archive order. Records are split on their "Collision" field,
+so the few collisions logged in *NoCollision*.json files still land in the pool.
+
+    python ingest_results.py --output ../NSGA/scenarios.json --types ChangeLane
+"""
+import argparse
+import json
+import os
+import re
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_ARCHIVE = os.path.join(HERE, "Scenario Results.zip")
+
+# scenario_runner output sometimes leaves a trailing comma before the closing bracket
+_TRAILING_COMMA = re.compile(r",(\s*[\]}])")
+
+
+def decode_member(data):
+    text = data.decode("utf-8-sig")
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return json.loads(_TRAILING_COMMA.sub(r"\1", text))
+
+
+def scenario_type(member_name):
+    # Members are stored as <ScenarioType>/<ScenarioType>[NoCollision][_n].json
+    return member_name.split("/", 1)[0]
+
+
+def result_members(archive, types=None):
+    return [
+        info.filename for info in archive.infolist()
+        if not info.is_dir() and info.filename.endswith(".json")
+        and (types is None or scenario_type(info.filename) in types)
+    ]
+
+
+def iter_member_records(zip_path=DEFAULT_ARCHIVE, types=None, workers=None):
+    """Yield (member name, records or None, error or None) for every result file, in archive order."""
+    with zipfile.ZipFile(zip_path) as archive:
+        members = result_members(archive, types)
+
+        def load(member_name):
+            try:
+                return member_name, decode_member(archive.read(member_name)), None
+            except ValueError as e:
+                return member_name, None, e
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(load, members)
+
+
+def load_results(zip_path=DEFAULT_ARCHIVE, types=None, workers=None):
+    """Return (collision records, no-collision records, {member: error}) from the archive."""
+    collisions, no_collisions, errors = [], [], {}
+    for member_name, records, error in iter_member_records(zip_path, types, workers):
+        if error is not None:
+            errors[member_name] = error
+            continue
+        for record in records:
+            (collisions if record.get("Collision") else no_collisions).append(record)
+    return collisions, no_collisions, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--archive", default=DEFAULT_ARCHIVE)
+    parser.add_argument("--output", default="./scenarios.json", help="collision records (the NSGA / Random Search pool)")
+    parser.add_argument("--no-collision-output", default=None, help="optionally also write the no-collision records")
+    parser.add_argument("--types", nargs="+", default=None, help="scenario type folders to include (default: all)")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    collisions, no_collisions, errors = load_results(args.archive, args.types, args.workers)
+    for member_name, error in errors.items():
+        print(f"Skipped {member_name}: {error}")
+
+    with open(args.output, 'w') as file:
+        json.dump(collisions, file, indent=4)
+    print(f"{len(collisions)} collision scenarios saved to:", args.output)
+
+    if args.no_collision_output:
+        with open(args.no_collision_output, 'w') as file:
+            json.dump(no_collisions, file, indent=4)
+        print(f"{len(no_collisions)} no-collision scenarios saved to:", args.no_collision_output)
+
+
+if __name__ == "__main__":
+    main()